@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.reader = User.objects.create_user(username='Читатель')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user,
+                group=cls.group if i % 2 else None)
+            for i in range(15)
+        ]
+        Comment.objects.create(
+            post=cls.posts[-1], author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_endpoints(self):
+        """Все адреса API отвечают JSON со страницей результатов."""
+
+        urls = {
+            reverse('api:posts'): 10,
+            reverse('api:group_posts', kwargs={'slug': 'test-slug'}): 7,
+            reverse('api:profile_posts',
+                    kwargs={'username': 'Василий'}): 10,
+            reverse('api:post_comments',
+                    kwargs={'post_id': self.posts[-1].pk}): 1,
+            reverse('api:follow'): 10,
+        }
+        for url, count in urls.items():
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), count)
+
+    def test_post_fields(self):
+        """Пост сериализуется плоско: автор и группа — строками."""
+
+        data = self.guest_client.get(reverse('api:posts')).json()
+        post = self.posts[-1]
+        self.assertEqual(data['results'][0], {
+            'id': post.pk,
+            'text': post.text,
+            'pub_date': data['results'][0]['pub_date'],
+            'author': 'Василий',
+            'group': None,
+            'comments_count': 1,
+            'image': None,
+        })
+
+    def test_sparse_fields(self):
+        """?fields= оставляет только запрошенные поля."""
+
+        response = self.guest_client.get(
+            reverse('api:posts'), {'fields': 'id,author'})
+        self.assertEqual(
+            set(response.json()['results'][0]), {'id', 'author'})
+
+        response = self.guest_client.get(
+            reverse('api:posts'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor(self):
+        """Курсор листает вперёд и назад без пропусков и повторов."""
+
+        first = self.guest_client.get(
+            reverse('api:posts'), {'fields': 'id'}).json()
+        self.assertIsNone(first['previous'])
+        second = self.guest_client.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        self.assertIn('fields=id', first['next'])
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(
+            ids, sorted((post.pk for post in self.posts), reverse=True))
+        back = self.guest_client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_lighter_than_html(self):
+        """Страница API в разы легче HTML-страницы той же ленты."""
+
+        html = self.guest_client.get(reverse('posts:index'))
+        api = self.guest_client.get(reverse('api:posts'))
+        self.assertLess(len(api.content) * 3, len(html.content))
+
+    def test_errors(self):
+        """Гостю лента подписок — 401, несуществующая группа — 404."""
+
+        response = self.guest_client.get(reverse('api:follow'))
+        self.assertEqual(response.status_code, 401)
+        response = self.guest_client.get(
+            reverse('api:group_posts', kwargs={'slug': 'nope'}))
+        self.assertEqual(response.status_code, 404)
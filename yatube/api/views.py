@@ -0,0 +1,162 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from core.replicas import read_from_replica
+from posts.feed import CURSOR_FIELD, CURSOR_TIEBREAK, follow_feed
+from posts.models import Comment, Group, Post, User
+from posts.paginators import CursorPaginator
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+image_storage = Post._meta.get_field('image').storage
+
+
+def image_url(name):
+    return image_storage.url(name) if name else None
+
+
+# Поля ответа: имя -> (путь для values(), преобразование значения)
+POST_FIELDS = {
+    'id': ('id', None),
+    'text': ('text', None),
+    'pub_date': ('pub_date', None),
+    'author': ('author__username', None),
+    'group': ('group__slug', None),
+    'comments_count': ('comments_count', None),
+    'image': ('image', image_url),
+}
+COMMENT_FIELDS = {
+    'id': ('id', None),
+    'post_id': ('post_id', None),
+    'text': ('text', None),
+    'created': ('created', None),
+    'author': ('author__username', None),
+}
+
+
+def json_response(data, status=200):
+    # Кириллица без \uXXXX: ответ вдвое короче
+    return JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def api_login_required(view):
+    """Как login_required, но вместо редиректа — 401."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return json_response({'detail': 'Нужна авторизация.'}, 401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def link(request, direction, cursor):
+    """Ссылка на соседнюю страницу с теми же параметрами."""
+
+    if not cursor:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[direction] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def paginated(request, queryset, fields, cursor_field='pub_date',
+              tiebreak='id'):
+    """Страница по курсору из словарей .values(), без экземпляров моделей.
+
+    ?fields=a,b оставляет в ответе и в SELECT только нужные поля;
+    поля курсора выбираются всегда, чтобы построить ссылки.
+    """
+
+    names = [
+        name.strip() for name in request.GET.get('fields', '').split(',')
+        if name.strip()
+    ] or list(fields)
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        return json_response({
+            'detail': f'Неизвестные поля: {", ".join(unknown)}.',
+            'fields': list(fields),
+        }, 400)
+
+    paths = {fields[name][0] for name in names} | {cursor_field, tiebreak}
+    paginator = CursorPaginator(
+        queryset.values(*paths), page_size(request), field=cursor_field,
+        tiebreak=tiebreak)
+    page = paginator.get_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+
+    results = []
+    for row in page:
+        item = {}
+        for name in names:
+            path, convert = fields[name]
+            item[name] = convert(row[path]) if convert else row[path]
+        results.append(item)
+    return json_response({
+        'results': results,
+        'next': link(request, 'after', page.next_cursor),
+        'previous': link(request, 'before', page.previous_cursor),
+    })
+
+
+@read_from_replica
+def posts(request):
+    """Все посты, как на главной."""
+
+    return paginated(request, Post.objects.all(), POST_FIELDS)
+
+
+@read_from_replica
+def group_posts(request, slug):
+    """Посты группы."""
+
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return paginated(
+        request, Post.objects.filter(group=group), POST_FIELDS)
+
+
+@read_from_replica
+def profile_posts(request, username):
+    """Посты автора."""
+
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return paginated(
+        request, Post.objects.filter(author=author), POST_FIELDS)
+
+
+@read_from_replica
+def post_comments(request, post_id):
+    """Комментарии поста, от новых к старым."""
+
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    return paginated(
+        request, Comment.objects.filter(post=post), COMMENT_FIELDS,
+        cursor_field='created',
+    )
+
+
+@api_login_required
+@read_from_replica
+def follow(request):
+    """Посты авторов, на которых подписан пользователь."""
+
+    return paginated(
+        request, follow_feed(request.user), POST_FIELDS,
+        cursor_field=CURSOR_FIELD, tiebreak=CURSOR_TIEBREAK,
+    )
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import replicas
+
+        post_save.connect(replicas.mark_written)
+        post_delete.connect(replicas.mark_written)
@@ -0,0 +1,31 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с прагмами и режимом транзакций из OPTIONS.
+
+    OPTIONS['pragmas'] выполняются на каждом новом соединении, поэтому
+    вместе с CONN_MAX_AGE ставятся один раз на соединение, а не на
+    запрос. OPTIONS['transaction_mode'] = 'IMMEDIATE' открывает atomic()
+    с BEGIN IMMEDIATE: запись сразу берёт блокировку и ждёт по
+    busy_timeout, а не падает с «database is locked», когда читающая
+    транзакция пытается стать пишущей.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
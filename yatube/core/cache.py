@@ -0,0 +1,183 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends import locmem
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from . import metrics
+
+_missing = object()
+
+
+class MetricsCacheMixin:
+    """Считает попадания и промахи cache.get() в метрики запроса."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version)
+        metrics.count_cache(value is not _missing)
+        return default if value is _missing else value
+
+
+class LocMemCache(MetricsCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class SQLiteCacheBackend(BaseCache):
+    """Кэш в отдельном файле SQLite, общий для процессов одной машины.
+
+    Целые числа хранятся как есть, поэтому incr() — один UPDATE, а не
+    get и set: одновременные сдвиги поколений не теряются. Остальные
+    значения хранятся pickle. Просроченные строки удаляются не чаще
+    раза в PURGE_INTERVAL секунд.
+    """
+
+    PURGE_INTERVAL = 60
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self._local = threading.local()
+        self._purged_at = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value, expires REAL)')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _dump(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        return value if isinstance(value, int) else pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return key
+
+    def _purge(self, conn):
+        now = time.time()
+        if now - self._purged_at >= self.PURGE_INTERVAL:
+            self._purged_at = now
+            conn.execute('DELETE FROM cache WHERE expires < ?', [now])
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        names = {self._key(key, version): key for key in keys}
+        if not names:
+            return {}
+        marks = ', '.join('?' * len(names))
+        rows = self._connection().execute(
+            f'SELECT key, value FROM cache WHERE key IN ({marks}) '
+            'AND (expires IS NULL OR expires > ?)',
+            [*names, time.time()],
+        )
+        return {names[name]: self._load(value) for name, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                [
+                    (self._key(key, version), self._dump(value), expires)
+                    for key, value in data.items()
+                ],
+            )
+            self._purge(conn)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                [key, time.time()])
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                [key, self._dump(value), self.get_backend_timeout(timeout)],
+            )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        name = self._key(key, version)
+        conn = self._connection()
+        with conn:
+            row = conn.execute(
+                'UPDATE cache SET value = value + ? WHERE key = ? '
+                "AND typeof(value) = 'integer' "
+                'AND (expires IS NULL OR expires > ?) RETURNING value',
+                [delta, name, time.time()],
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                [self.get_backend_timeout(timeout), self._key(key, version),
+                 time.time()],
+            )
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version) is not _missing
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        names = [self._key(key, version) for key in keys]
+        if names:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'DELETE FROM cache WHERE key IN '
+                    f'({", ".join("?" * len(names))})', names)
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM cache')
+
+
+class SQLiteCache(MetricsCacheMixin, SQLiteCacheBackend):
+    pass
+
+
+def shared():
+    """Кэш, общий для веб-процессов и команд manage.py."""
+
+    return caches['shared']
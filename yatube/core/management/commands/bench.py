@@ -0,0 +1,198 @@
+import json
+import math
+import statistics
+import subprocess
+import time
+from importlib import import_module
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, User
+
+# Модули URL, все пути которых прогоняет замер
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls', 'api.urls')
+QUANTILES = (50, 95, 99)
+# Не замеряется: выгрузка только для сотрудников и читает всю базу
+EXCLUDED = ('posts:export',)
+
+
+def percentile(values, q):
+    """Процентиль по ближайшему рангу."""
+
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95/p99 и число SQL-запросов на всех адресах '
+        'posts, users, about и api и пишет отчёт в JSON для сравнения '
+        'между коммитами. Данные удобно готовить командой seed_bench.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько раз запрашивать каждый адрес.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Сколько первых запросов не учитывать.',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--user',
+            help='От чьего имени ходить; по умолчанию — у кого больше '
+                 'всего подписок.',
+        )
+        parser.add_argument('--output', default='bench_report.json')
+        parser.add_argument(
+            '--compare',
+            help='Прошлый отчёт, с которым сравнить результат.',
+        )
+
+    def handle(self, *args, **options):
+        self.user = self.bench_user(options['user'])
+        client = Client()
+        results = {}
+        for name, path in self.urls():
+            timings, queries, status = [], [], None
+            for i in range(options['warmup'] + options['requests']):
+                if options['cold']:
+                    cache.clear()
+                if '_auth_user_id' not in client.session:
+                    client.force_login(self.user)
+                elapsed, n_queries, status = self.request(client, path)
+                if i >= options['warmup']:
+                    timings.append(elapsed)
+                    queries.append(n_queries)
+            results[name] = self.summarize(path, status, timings, queries)
+            self.stdout.write(self.format_row(name, results[name]))
+
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'created': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'requests': options['requests'],
+                'cold': options['cold'],
+                'rows': {
+                    model._meta.model_name: model.objects.count()
+                    for model in (User, Group, Post, Comment, Follow)
+                },
+            },
+            'urls': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт записан в {options["output"]}'))
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                self.compare(json.load(file), report)
+
+    def bench_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'Нет пользователя {username}.')
+        user = User.objects.order_by(
+            F('stats__following_count').desc(nulls_last=True), 'pk',
+        ).first()
+        if user is None:
+            raise CommandError('База пуста: запустите seed_bench.')
+        return user
+
+    def urls(self):
+        """(имя, путь) для каждого адреса; параметры — из живых данных."""
+
+        post = Post.objects.order_by('-comments_count', '-pk').first()
+        group = Group.objects.order_by('-posts_count', 'pk').first()
+        author = post.author if post else self.user
+        samples = {
+            'post_id': post and post.pk,
+            'slug': group and group.slug,
+            'username': author.username,
+            'fmt': 'atom',
+        }
+        for module_name in URLCONFS:
+            module = import_module(module_name)
+            for pattern in module.urlpatterns:
+                name = f'{module.app_name}:{pattern.name}'
+                if name in EXCLUDED:
+                    continue
+                params = pattern.pattern.converters
+                kwargs = {key: samples.get(key) for key in params}
+                if None in kwargs.values():
+                    self.stderr.write(f'{name}: нет данных, пропускаю')
+                    continue
+                yield name, reverse(name, kwargs=kwargs)
+
+    def request(self, client, path):
+        """Один GET; всё, что он записал в базу, откатывается."""
+
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed * 1000, len(captured), response.status_code
+
+    def summarize(self, path, status, timings, queries):
+        summary = {'path': path, 'status': status}
+        for q in QUANTILES:
+            summary[f'p{q}_ms'] = round(percentile(timings, q), 2)
+        summary['mean_ms'] = round(statistics.mean(timings), 2)
+        summary['max_ms'] = round(max(timings), 2)
+        summary['queries'] = round(statistics.mean(queries), 1)
+        return summary
+
+    def format_row(self, name, summary):
+        return (
+            f'{name:32} {summary["status"]:>4} '
+            f'p50 {summary["p50_ms"]:>8.2f}  p95 {summary["p95_ms"]:>8.2f}  '
+            f'p99 {summary["p99_ms"]:>8.2f} ms  '
+            f'SQL {summary["queries"]:>5}'
+        )
+
+    def compare(self, old, new):
+        """Изменение p50, p95 и числа запросов в процентах."""
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Сравнение с {old["meta"].get("commit")}'))
+        for name, summary in new['urls'].items():
+            before = old['urls'].get(name)
+            if before is None:
+                self.stdout.write(f'{name:32} новый адрес')
+                continue
+            deltas = []
+            for key in ('p50_ms', 'p95_ms', 'queries'):
+                if before[key]:
+                    change = (summary[key] - before[key]) / before[key] * 100
+                    deltas.append(f'{key} {change:+7.1f}%')
+                else:
+                    deltas.append(f'{key} {summary[key] - before[key]:+7}')
+            self.stdout.write(f'{name:32} ' + '  '.join(deltas))
@@ -0,0 +1,186 @@
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from os import path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from posts.models import Comment, Post, User
+
+POSTS = Post._meta.db_table
+COMMENTS = Comment._meta.db_table
+USERS = User._meta.db_table
+
+# Чтение как на главной: страница ленты с авторами
+READ_SQL = (
+    f'SELECT p.id, p.text, p.pub_date, u.username FROM {POSTS} p '
+    f'JOIN {USERS} u ON u.id = p.author_id '
+    'ORDER BY p.pub_date DESC LIMIT 10 OFFSET %s'
+)
+# Запись как в add_comment: чтение поста, комментарий, счётчик
+WRITE_SQL = (
+    (f'SELECT id FROM {POSTS} WHERE id = %s', 'post'),
+    (f'INSERT INTO {COMMENTS} (post_id, author_id, text, created) '
+     'VALUES (%s, %s, %s, %s)', 'comment'),
+    (f'UPDATE {POSTS} SET comments_count = comments_count + 1 '
+     'WHERE id = %s', 'post'),
+)
+
+
+def profiles():
+    """Профиль из DATABASES и стандартный sqlite3 без настроек."""
+
+    tuned = settings.DATABASES['default']
+    return {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {},
+        },
+        'tuned': {
+            'ENGINE': tuned['ENGINE'],
+            'CONN_MAX_AGE': tuned.get('CONN_MAX_AGE', 0),
+            'OPTIONS': dict(tuned.get('OPTIONS', {})),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения и записи SQLite '
+        'с настройками из DATABASES и со стандартными. Замер идёт на '
+        'копиях текущей базы в несколько потоков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Сколько длится замер каждого профиля.',
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля операций записи.',
+        )
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Замер только для SQLite.')
+        self.post_ids = list(
+            Post.objects.order_by('?').values_list('id', flat=True)[:10000])
+        self.user_ids = list(
+            User.objects.order_by('?').values_list('id', flat=True)[:1000])
+        if not self.post_ids:
+            raise CommandError('База пуста: запустите seed_bench.')
+        self.pages = max(len(self.post_ids) // 10, 1)
+
+        directory = tempfile.mkdtemp(prefix='bench-sqlite-')
+        try:
+            for name, profile in profiles().items():
+                alias = f'bench_sqlite_{name}'
+                connections.databases[alias] = dict(
+                    profile, NAME=self.copy_database(directory, name))
+                try:
+                    result = self.run(alias, profile, options)
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+                self.stdout.write(self.format_result(name, result))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def copy_database(self, directory, name):
+        """Копия текущей базы в журнале по умолчанию (DELETE)."""
+
+        source = connections['default']
+        source.ensure_connection()
+        target_name = path.join(directory, f'{name}.sqlite3')
+        target = sqlite3.connect(target_name)
+        try:
+            source.connection.backup(target)
+            target.execute('PRAGMA journal_mode = delete')
+        finally:
+            target.close()
+        return target_name
+
+    def run(self, alias, profile, options):
+        stats = {'read': [], 'write': [], 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        persistent = profile['CONN_MAX_AGE'] != 0
+
+        def worker(seed):
+            rng = random.Random(seed)
+            timings = {'read': [], 'write': []}
+            errors = 0
+            connection = connections[alias]
+            while time.monotonic() < deadline:
+                kind = (
+                    'write' if rng.random() < options['write_ratio']
+                    else 'read'
+                )
+                started = time.perf_counter()
+                try:
+                    getattr(self, kind)(alias, rng)
+                    timings[kind].append(time.perf_counter() - started)
+                except OperationalError:
+                    errors += 1
+                if not persistent:
+                    # Как close_old_connections в конце запроса
+                    connection.close()
+            connection.close()
+            with lock:
+                stats['read'] += timings['read']
+                stats['write'] += timings['write']
+                stats['errors'] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=(seed,))
+            for seed in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats['seconds'] = options['seconds']
+        return stats
+
+    def read(self, alias, rng):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(READ_SQL, [rng.randrange(self.pages) * 10])
+            cursor.fetchall()
+
+    def write(self, alias, rng):
+        post_id = rng.choice(self.post_ids)
+        connection = connections[alias]
+        created = connection.ops.adapt_datetimefield_value(timezone.now())
+        values = {
+            'post': [post_id],
+            'comment': [post_id, rng.choice(self.user_ids), 'Замер', created],
+        }
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                for sql, params in WRITE_SQL:
+                    cursor.execute(sql, values[params])
+
+    def format_result(self, name, result):
+        parts = [f'{name:8}']
+        for kind in ('read', 'write'):
+            timings = result[kind]
+            rate = len(timings) / result['seconds']
+            p50 = statistics.median(timings) * 1000 if timings else 0
+            p95 = (
+                sorted(timings)[int(len(timings) * 0.95)] * 1000
+                if timings else 0
+            )
+            parts.append(
+                f'{kind}s/s {rate:9.1f} (p50 {p50:6.2f}, p95 {p95:7.2f} ms)')
+        parts.append(f'ошибок {result["errors"]}')
+        return '  '.join(parts)
@@ -0,0 +1,93 @@
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from core.management.commands.bench import percentile
+from posts.models import Post, User
+
+TEMPLATE = 'posts/index.html'
+
+
+def build_engine(cached):
+    """Движок с настройками из TEMPLATES и загрузчиком с кэшем или без."""
+
+    params = copy.deepcopy(settings.TEMPLATES[0])
+    backend = import_string(params.pop('BACKEND'))
+    loaders = settings.TEMPLATE_LOADERS
+    params['OPTIONS']['loaders'] = (
+        [('django.template.loaders.cached.Loader', loaders)]
+        if cached else loaders
+    )
+    params.update(
+        NAME=f'bench_{"cached" if cached else "plain"}', APP_DIRS=False)
+    return backend(params)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет стоимость отрисовки шаблона главной страницы с '
+        'кэшированием скомпилированных шаблонов и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=10,
+            help='Сколько постов на странице.',
+        )
+        parser.add_argument(
+            '--renders', type=int, default=200,
+            help='Сколько раз отрисовать страницу в каждом режиме.',
+        )
+
+    def handle(self, *args, **options):
+        n = options['posts']
+        # Постов втрое больше страницы, чтобы отрисовался и паджинатор
+        posts = list(
+            Post.objects.select_related('author', 'group')[:n * 3])
+        if not posts:
+            raise CommandError('База пуста: запустите seed_bench.')
+        request = RequestFactory().get('/')
+        request.user = User(username='bench')
+        context = {
+            'headline': 'Последние обновления на сайте',
+            'page_obj': Paginator(posts, n).page(1),
+            'index': True,
+            # Без кэша фрагментов: посты отрисовываются каждый раз
+            'feed_cache_timeout': 0,
+            'feed_generation': 'bench',
+        }
+
+        results = {}
+        for cached in (False, True):
+            template_engine = build_engine(cached)
+            timings = []
+            for _ in range(options['renders'] + 1):
+                started = time.perf_counter()
+                template_engine.get_template(TEMPLATE).render(
+                    context, request)
+                timings.append((time.perf_counter() - started) * 1000)
+            name = 'cached' if cached else 'plain'
+            results[name] = timings
+            self.stdout.write(self.format_row(name, timings))
+
+        plain = statistics.median(results['plain'][1:])
+        cached = statistics.median(results['cached'][1:])
+        self.stdout.write(self.style.SUCCESS(
+            f'Кэш шаблонов ускоряет отрисовку в {plain / cached:.1f} раза.'))
+
+    def format_row(self, name, timings):
+        """Первая отрисовка отдельно: в ней компилируются все шаблоны."""
+
+        rest = timings[1:]
+        return (
+            f'{name:8} первая {timings[0]:7.2f}  '
+            f'p50 {percentile(rest, 50):7.2f}  '
+            f'p95 {percentile(rest, 95):7.2f}  '
+            f'среднее {statistics.mean(rest):7.2f} ms'
+        )
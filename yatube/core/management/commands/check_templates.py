@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import template_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны из templates/ и сообщает, включён ли '
+        'кэширующий загрузчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--require-cache', action='store_true',
+            help='Ошибка, если кэширующий загрузчик выключен.',
+        )
+
+    def handle(self, *args, **options):
+        failed = False
+        for engine in template_cache.django_engines():
+            cached = template_cache.is_cached(engine)
+            loaded, errors, seconds = template_cache.compile_all(engine)
+            self.stdout.write(
+                f'{engine.name}: загрузчик '
+                f'{"кэширующий" if cached else "без кэша"}, '
+                f'шаблонов {loaded}, {seconds * 1000:.1f} мс')
+            for name, error in errors.items():
+                self.stderr.write(f'  {name}: {error}')
+            if errors:
+                failed = True
+            if options['require_cache'] and not cached:
+                self.stderr.write(
+                    f'  {engine.name}: включите YATUBE_TEMPLATE_CACHE=1')
+                failed = True
+        if failed:
+            raise CommandError('Проверка шаблонов не пройдена.')
+        self.stdout.write(self.style.SUCCESS('Шаблоны в порядке.'))
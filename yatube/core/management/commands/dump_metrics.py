@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+COLUMNS = ('count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+           'duration_avg', 'queries_avg', 'sql_avg', 'template_avg')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводит гистограммы задержек по видам, которые процессы сайта '
+        'сбрасывают в METRICS_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести сводку целиком в JSON.',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='После вывода удалить накопленные гистограммы.',
+        )
+
+    def handle(self, *args, **options):
+        report = metrics.report()
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        elif not report:
+            self.stdout.write('Данных пока нет.')
+        else:
+            width = max(len(view_name) for view_name in report)
+            self.stdout.write(
+                'view'.ljust(width)
+                + ''.join(column.rjust(14) for column in COLUMNS))
+            for view_name, summary in report.items():
+                self.stdout.write(view_name.ljust(width) + ''.join(
+                    str(summary[column]).rjust(14) for column in COLUMNS))
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS('Гистограммы сброшены.'))
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Верхние границы корзин гистограммы задержек, мс; последняя — «больше»
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUANTILES = (50, 95, 99)
+# Суммируемые поля: время в мс и счётчики на все запросы вида
+TOTALS = ('duration', 'queries', 'sql', 'template', 'cache_hits',
+          'cache_misses')
+
+current = ContextVar('request_metrics', default=None)
+
+_lock = threading.Lock()
+_histograms = {}
+_flushed_at = 0.0
+
+
+class RequestMetrics:
+    """Счётчики одного запроса.
+
+    Экземпляр сам служит обёрткой connection.execute_wrapper и считает
+    число запросов к БД и время на них.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += time.perf_counter() - start
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, view_name):
+        """Значение заголовка Server-Timing."""
+
+        return ', '.join([
+            f'sql;dur={self.sql * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'view;desc="{view_name}"',
+            f'total;dur={self.elapsed() * 1000:.1f}',
+        ])
+
+
+def add_template_time(seconds):
+    metrics = current.get()
+    if metrics is not None:
+        metrics.template += seconds
+
+
+def count_cache(hit):
+    metrics = current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def empty_histogram():
+    histogram = dict.fromkeys(TOTALS, 0)
+    histogram.update(count=0, max=0.0, buckets=[0] * (len(BUCKETS) + 1))
+    return histogram
+
+
+def bucket_index(ms):
+    for index, bound in enumerate(BUCKETS):
+        if ms <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def record(view_name, metrics):
+    """Добавляет запрос в гистограмму его вида."""
+
+    ms = metrics.elapsed() * 1000
+    values = {
+        'duration': ms,
+        'queries': metrics.queries,
+        'sql': metrics.sql * 1000,
+        'template': metrics.template * 1000,
+        'cache_hits': metrics.cache_hits,
+        'cache_misses': metrics.cache_misses,
+    }
+    with _lock:
+        histogram = _histograms.setdefault(view_name, empty_histogram())
+        histogram['count'] += 1
+        histogram['max'] = max(histogram['max'], ms)
+        histogram['buckets'][bucket_index(ms)] += 1
+        for name, value in values.items():
+            histogram[name] += value
+    flush()
+
+
+def snapshot():
+    with _lock:
+        return json.loads(json.dumps(_histograms))
+
+
+def dump_path(pid=None):
+    return os.path.join(settings.METRICS_DIR, f'{pid or os.getpid()}.json')
+
+
+def flush(force=False):
+    """Раз в METRICS_FLUSH_INTERVAL пишет гистограммы процесса в файл.
+
+    Так их видит команда dump_metrics и процессы других воркеров.
+    """
+
+    global _flushed_at
+    now = time.monotonic()
+    if not force and now - _flushed_at < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _flushed_at = now
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = dump_path()
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(snapshot(), file)
+    os.replace(f'{path}.tmp', path)
+
+
+def merge(target, histograms):
+    for view_name, histogram in histograms.items():
+        merged = target.setdefault(view_name, empty_histogram())
+        merged['count'] += histogram['count']
+        merged['max'] = max(merged['max'], histogram['max'])
+        for index, count in enumerate(histogram['buckets']):
+            merged['buckets'][index] += count
+        for name in TOTALS:
+            merged[name] += histogram[name]
+    return target
+
+
+def collect():
+    """Гистограммы всех процессов: из файлов и живые текущего."""
+
+    histograms = {}
+    own = os.path.basename(dump_path())
+    if os.path.isdir(settings.METRICS_DIR):
+        for name in os.listdir(settings.METRICS_DIR):
+            if not name.endswith('.json') or name == own:
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIR, name)) as file:
+                    merge(histograms, json.load(file))
+            except (OSError, ValueError):
+                continue
+    return merge(histograms, snapshot())
+
+
+def quantile(histogram, q):
+    """Оценка квантиля сверху: граница корзины, где он лежит."""
+
+    rank = histogram['count'] * q / 100
+    seen = 0
+    for index, count in enumerate(histogram['buckets']):
+        seen += count
+        if count and seen >= rank:
+            return BUCKETS[index] if index < len(BUCKETS) else None
+    return None
+
+
+def summarize(histogram):
+    count = histogram['count'] or 1
+    summary = {
+        'count': histogram['count'],
+        'max_ms': round(histogram['max'], 1),
+        'buckets': dict(zip(
+            [f'le_{bound}' for bound in BUCKETS] + ['inf'],
+            histogram['buckets'],
+        )),
+    }
+    for q in QUANTILES:
+        summary[f'p{q}_ms'] = quantile(histogram, q)
+    for name in TOTALS:
+        summary[f'{name}_avg'] = round(histogram[name] / count, 2)
+    return summary
+
+
+def report():
+    """Сводка по видам, отсортированная по суммарному времени."""
+
+    histograms = collect()
+    ordered = sorted(
+        histograms.items(), key=lambda item: -item[1]['duration'])
+    return {view_name: summarize(h) for view_name, h in ordered}
+
+
+def reset():
+    """Сбрасывает гистограммы процесса и удаляет файлы всех процессов."""
+
+    with _lock:
+        _histograms.clear()
+    if os.path.isdir(settings.METRICS_DIR):
+        for name in os.listdir(settings.METRICS_DIR):
+            if name.endswith('.json'):
+                os.remove(os.path.join(settings.METRICS_DIR, name))
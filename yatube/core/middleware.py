@@ -0,0 +1,72 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, replicas
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class MetricsMiddleware:
+    """Меряет запрос: SQL, шаблоны, кэш, общее время.
+
+    Итог уходит в заголовок Server-Timing и в гистограммы по имени
+    вида (см. core.metrics). Стоит первым в MIDDLEWARE, чтобы в общее
+    время попали и остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else 'unresolved'
+        response['Server-Timing'] = request_metrics.server_timing(view_name)
+        metrics.record(view_name, request_metrics)
+        return response
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик и «прилипание» к основной базе.
+
+    Вид читает с реплики, только если он помечен read_from_replica,
+    запрос безопасный (GET, HEAD) и пользователь ничего не писал
+    последние REPLICA_PIN_SECONDS. После POST или сохранения модели
+    метка в сессии продлевается, и пользователь видит свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replica_token = replicas.use_replica.set(False)
+        written_token = replicas.written.set(False)
+        try:
+            response = self.get_response(request)
+            if replicas.written.get() or request.method not in SAFE_METHODS:
+                replicas.pin(request)
+        finally:
+            replicas.use_replica.reset(replica_token)
+            replicas.written.reset(written_token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and getattr(view_func, 'read_from_replica', False)
+            and request.method in SAFE_METHODS
+            and not replicas.pinned(request)
+        ):
+            replicas.use_replica.set(True)
@@ -0,0 +1,82 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# Ключ сессии: до какого момента читать с основной базы
+SESSION_KEY = 'replica_pin_until'
+# Приложения, которые читаются только с основной базы
+PRIMARY_ONLY_APPS = {'sessions'}
+
+use_replica = ContextVar('use_replica', default=False)
+written = ContextVar('written', default=False)
+
+
+def read_from_replica(view):
+    """Помечает вид, которому можно читать с реплики."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return view(*args, **kwargs)
+
+    wrapper.read_from_replica = True
+    return wrapper
+
+
+def reading_replica():
+    """Текущий запрос читает с реплик."""
+
+    return bool(settings.DATABASE_REPLICAS) and use_replica.get()
+
+
+def pick_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def pinned(request):
+    """Пользователь недавно писал и пока читает свои записи с основной."""
+
+    return request.session.get(SESSION_KEY, 0) > time.time()
+
+
+def mark_written(sender, **kwargs):
+    """post_save/post_delete: запрос записал данные, которые прочтёт.
+
+    db_for_write для этого не годится: его зовут и на чтении, чтобы
+    выбрать базу, а не только перед настоящей записью.
+    """
+
+    if sender._meta.app_label not in PRIMARY_ONLY_APPS:
+        written.set(True)
+
+
+def pin(request):
+    request.session[SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+
+
+class ReplicaRouter:
+    """Чтение видов с read_from_replica — с реплик, остальное — с default.
+
+    Реплики считаются копиями default: связи разрешены, миграции
+    выполняются только на основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.DATABASE_REPLICAS
+            and use_replica.get()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            return pick_replica()
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
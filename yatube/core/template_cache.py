@@ -0,0 +1,74 @@
+import logging
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger(__name__)
+
+
+def django_engines():
+    return [
+        engine for engine in engines.all()
+        if isinstance(engine, DjangoTemplates)
+    ]
+
+
+def is_cached(engine):
+    """Стоит ли у движка кэширующий загрузчик."""
+
+    return any(
+        isinstance(loader, CachedLoader)
+        for loader in engine.engine.template_loaders
+    )
+
+
+def template_names(engine):
+    """Имена всех шаблонов из DIRS движка, то есть из templates/."""
+
+    names = []
+    for directory in engine.engine.dirs:
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                if file_name.endswith(('.html', '.txt', '.xml')):
+                    path = os.path.join(root, file_name)
+                    names.append(os.path.relpath(path, directory))
+    return sorted(set(name.replace(os.sep, '/') for name in names))
+
+
+def compile_all(engine):
+    """Компилирует все шаблоны движка.
+
+    Возвращает число скомпилированных, словарь ошибок по именам
+    и затраченное время в секундах.
+    """
+
+    started = time.perf_counter()
+    loaded, errors = 0, {}
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = str(error)
+        else:
+            loaded += 1
+    return loaded, errors, time.perf_counter() - started
+
+
+def warm_up():
+    """Заполняет кэш загрузчика при старте воркера.
+
+    Без кэширующего загрузчика ничего не делает: шаблоны всё равно
+    будут читаться с диска на каждой отрисовке.
+    """
+
+    for engine in django_engines():
+        if not is_cached(engine):
+            continue
+        loaded, errors, seconds = compile_all(engine)
+        for name, error in errors.items():
+            logger.error('Шаблон %s не компилируется: %s', name, error)
+        logger.info(
+            'Шаблонов %s скомпилировано за %.0f мс', loaded, seconds * 1000)
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name = 'Приложение posts'
+
+    def ready(self):
+        from . import signals
+
+        post_migrate.connect(signals.search_triggers, sender=self)
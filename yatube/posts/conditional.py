@@ -0,0 +1,68 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import feed_cache
+
+
+class NotModified(Exception):
+    """У клиента свежая копия: вид прерывается, как при Http404."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def check(request, scope, personal=True):
+    """Сверяет If-None-Match и If-Modified-Since с лентой scope.
+
+    ETag строится из поколения ленты, Last-Modified — время её
+    последнего изменения; оба читаются из кэша без запросов к базе.
+    Вызывается в виде до тяжёлых запросов страницы. Страница с
+    personal=False у всех одинакова, и её могут хранить общие кэши.
+    Страница с отстающей реплики уходит без валидаторов.
+    """
+
+    if feed_cache.replica_may_lag(scope):
+        return
+    parts = [feed_cache.generation(scope), request.get_full_path()]
+    if personal:
+        # Страница зависит от пользователя, а форма — от CSRF-куки
+        parts += [
+            request.user.pk,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        ]
+    etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+    last_modified = feed_cache.last_modified(scope)
+    request._validators = etag, last_modified, personal
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        raise NotModified(response)
+
+
+def conditional_get(view):
+    """Ставит ETag и Last-Modified, если вид вызвал check()."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+        except NotModified as error:
+            response = error.response
+        validators = getattr(request, '_validators', None)
+        if validators and request.method in ('GET', 'HEAD'):
+            etag, last_modified, personal = validators
+            response.setdefault('ETag', etag)
+            response.setdefault('Last-Modified', http_date(last_modified))
+            # Хранить можно, но перед показом — всегда сверять
+            directives = {'no_cache': True}
+            if personal and request.user.is_authenticated:
+                directives['private'] = True
+            patch_cache_control(response, **directives)
+        return response
+
+    return wrapper
@@ -0,0 +1,109 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+# Счётчик AuthorStats: (модель, поле со ссылкой на пользователя)
+AUTHOR_COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'comments_count': (Comment, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+}
+
+
+def count_subquery(model, field):
+    """Сколько строк model ссылается через field на OuterRef('pk')."""
+
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(n=Count('pk')).values('n')
+    ), 0)
+
+
+def bump(queryset, field, delta):
+    """Атомарно сдвигает счётчик, не уходя ниже нуля."""
+
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def bump_author(user_id, field, delta):
+    """Сдвигает счётчик пользователя, при первом росте создаёт строку."""
+
+    if user_id is None:
+        return
+    updated = bump(AuthorStats.objects.filter(user_id=user_id), field, delta)
+    # При уменьшении строку не создаём: пользователь может удаляться
+    # каскадом прямо сейчас.
+    if not updated and delta > 0:
+        create_author_stats(user_id)
+
+
+def bump_group(group_id, delta):
+    if group_id is not None:
+        bump(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def create_author_stats(user_id):
+    """Считает счётчики пользователя с нуля и сохраняет их."""
+
+    values = User.objects.filter(pk=user_id).annotate(**{
+        name: count_subquery(model, field)
+        for name, (model, field) in AUTHOR_COUNTERS.items()
+    }).values(*AUTHOR_COUNTERS).first()
+    if values is None:
+        return None
+    try:
+        with transaction.atomic():
+            return AuthorStats.objects.create(user_id=user_id, **values)
+    except IntegrityError:
+        return AuthorStats.objects.get(user_id=user_id)
+
+
+def get_author_stats(user):
+    """Счётчики пользователя без COUNT по постам на каждый просмотр."""
+
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        return create_author_stats(user.pk)
+
+
+def targets():
+    """Все денормализованные счётчики: (имя, queryset, поле, подзапрос)."""
+
+    yield ('post.comments_count', Post.objects.all(), 'comments_count',
+           count_subquery(Comment, 'post'))
+    yield ('group.posts_count', Group.objects.all(), 'posts_count',
+           count_subquery(Post, 'group'))
+    for name, (model, field) in AUTHOR_COUNTERS.items():
+        yield (f'stats.{name}', AuthorStats.objects.all(), name,
+               count_subquery(model, field))
+
+
+def rebuild(check=False):
+    """Пересчитывает все счётчики пачками UPDATE.
+
+    Возвращает число расходящихся строк по каждому счётчику; с check=True
+    ничего не меняет, только ищет расхождения.
+    """
+
+    drift = {}
+    missing = User.objects.filter(stats__isnull=True)
+    drift['stats.missing'] = missing.count()
+    if not check and drift['stats.missing']:
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(user_id=pk)
+             for pk in missing.values_list('pk', flat=True)],
+            ignore_conflicts=True,
+        )
+
+    for name, queryset, field, actual in targets():
+        drift[name] = queryset.annotate(actual=actual).exclude(
+            **{field: F('actual')}).count()
+        if not check and drift[name]:
+            queryset.update(**{field: actual})
+    return drift
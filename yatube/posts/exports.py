@@ -0,0 +1,106 @@
+import csv
+import datetime as dt
+import json
+
+from django.utils import timezone
+
+from .models import Comment, Post
+
+CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+# Колонки выгрузки и пути к ним для values_list(); id всегда первый
+POST_FIELDS = {
+    'id': 'id',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'comments_count': 'comments_count',
+    'image': 'image',
+    'text': 'text',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post_id': 'post_id',
+    'created': 'created',
+    'author': 'author__username',
+    'text': 'text',
+}
+# Что выгружается: модель, колонки, поле даты, путь к слагу группы
+KINDS = {
+    'posts': (Post, POST_FIELDS, 'pub_date', 'group__slug'),
+    'comments': (Comment, COMMENT_FIELDS, 'created', 'post__group__slug'),
+}
+
+
+class Echo:
+    """Файл для csv.writer, который просто отдаёт строку."""
+
+    def write(self, value):
+        return value
+
+
+def start_of_day(date):
+    return timezone.make_aware(dt.datetime.combine(date, dt.time.min))
+
+
+def queryset(kind, since=None, until=None, group=None, author=None,
+             using=None):
+    """Строки выгрузки kind с фильтрами; until включительно."""
+
+    model, fields, date_field, group_field = KINDS[kind]
+    rows = model.objects.using(using).order_by()
+    if since:
+        rows = rows.filter(**{f'{date_field}__gte': start_of_day(since)})
+    if until:
+        rows = rows.filter(**{
+            f'{date_field}__lt': start_of_day(until + dt.timedelta(days=1))})
+    if group:
+        rows = rows.filter(**{group_field: group})
+    if author:
+        rows = rows.filter(author__username=author)
+    return rows.values_list(*fields.values())
+
+
+def chunks(rows, size=CHUNK_SIZE):
+    """Пачки строк по ключу id.
+
+    Каждая пачка — короткий отдельный запрос, так что память не растёт
+    с размером таблицы и курсор не держит снимок базы всю выгрузку.
+    """
+
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_id).order_by('pk')[:size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def plain(value):
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    return value
+
+
+def stream(kind, fmt, chunks):
+    """Текст выгрузки: по строке на пачку, в CSV — с заголовком."""
+
+    columns = list(KINDS[kind][1])
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns)
+        for chunk in chunks:
+            yield ''.join(
+                writer.writerow([plain(value) for value in row])
+                for row in chunk)
+    else:
+        for chunk in chunks:
+            yield ''.join(
+                json.dumps(
+                    dict(zip(columns, map(plain, row))), ensure_ascii=False)
+                + '\n'
+                for row in chunk)
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+
+from .models import FeedItem, FeedPullAuthor, Follow, Post
+
+# Ключ курсора ленты подписок: поля, которые добавляет follow_feed()
+CURSOR_FIELD = 'feed_pub_date'
+CURSOR_TIEBREAK = 'feed_id'
+
+
+def fan_out(post):
+    """Рассылает новый пост по лентам подписчиков автора.
+
+    Если подписчиков больше FEED_FANOUT_LIMIT, автор попадает
+    в FeedPullAuthor и дальше его посты читаются напрямую.
+    """
+
+    author_id = post.author_id
+    if FeedPullAuthor.objects.filter(author_id=author_id).exists():
+        return
+    followers = Follow.objects.filter(
+        author_id=author_id, user__isnull=False)
+    if followers.count() > settings.FEED_FANOUT_LIMIT:
+        FeedPullAuthor.objects.get_or_create(author_id=author_id)
+        return
+    FeedItem.objects.bulk_create(
+        [
+            FeedItem(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.values_list('user_id', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill(follow):
+    """Добавляет в ленту нового подписчика уже опубликованные посты."""
+
+    if follow.user_id is None:
+        return
+    if FeedPullAuthor.objects.filter(author_id=follow.author_id).exists():
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id).values_list('id', 'pub_date')
+    FeedItem.objects.bulk_create(
+        [
+            FeedItem(user_id=follow.user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts.iterator()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def trim(follow):
+    """Убирает из ленты посты автора после отписки."""
+
+    if follow.user_id is None:
+        return
+    FeedItem.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id).delete()
+
+
+def rebuild():
+    """Пересобирает все ленты одним INSERT … SELECT.
+
+    Для массовой загрузки через bulk_create, когда сигналы рассылки
+    не срабатывали. Авторов сверх FEED_FANOUT_LIMIT переводит на чтение.
+    """
+
+    heavy = (
+        Follow.objects.filter(user__isnull=False).order_by()
+        .values('author_id').annotate(n=Count('user_id', distinct=True))
+        .filter(n__gt=settings.FEED_FANOUT_LIMIT)
+    )
+    with transaction.atomic():
+        FeedPullAuthor.objects.bulk_create(
+            [FeedPullAuthor(author_id=row['author_id']) for row in heavy],
+            ignore_conflicts=True,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FeedItem._meta.db_table}')
+            cursor.execute(
+                f'INSERT INTO {FeedItem._meta.db_table} '
+                '(user_id, post_id, pub_date) '
+                'SELECT DISTINCT f.user_id, p.id, p.pub_date '
+                f'FROM {Follow._meta.db_table} f '
+                f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+                'WHERE f.user_id IS NOT NULL AND f.author_id NOT IN '
+                f'(SELECT author_id FROM {FeedPullAuthor._meta.db_table})'
+            )
+            return cursor.rowcount
+
+
+def follow_feed(user):
+    """Посты авторов, на которых подписан пользователь.
+
+    Обычно это одно чтение по индексу (user, -pub_date, -id) ленты:
+    ключ курсора — дата и id записи ленты, а не поста. Если среди
+    подписок есть авторы без рассылки, их посты подмешиваются запросом
+    с ключом по самому посту.
+    """
+
+    pull_ids = list(Follow.objects.filter(
+        user=user, author__feed_pull__isnull=False,
+    ).values_list('author_id', flat=True))
+    if not pull_ids:
+        posts = Post.objects.filter(feed_items__user=user).annotate(
+            **{CURSOR_FIELD: F('feed_items__pub_date'),
+               CURSOR_TIEBREAK: F('feed_items__id')})
+    else:
+        inbox = FeedItem.objects.filter(user=user).values('post_id')
+        posts = Post.objects.filter(
+            Q(pk__in=inbox) | Q(author_id__in=pull_ids)
+        ).annotate(**{CURSOR_FIELD: F('pub_date'), CURSOR_TIEBREAK: F('id')})
+    return posts.order_by(f'-{CURSOR_FIELD}', f'-{CURSOR_TIEBREAK}')
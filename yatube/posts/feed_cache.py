@@ -0,0 +1,112 @@
+import time
+
+from core import replicas
+from core.cache import shared
+from django.conf import settings
+from django.db import transaction
+
+# Поколение, общее для всех лент: имена авторов, слаги групп
+GLOBAL = 'all'
+# Страница «В тренде»: показывает посты из любых лент
+TRENDING = 'trending'
+
+
+def _key(scope):
+    return f'feed-gen:{scope}'
+
+
+def _changed_key(scope):
+    return f'feed-changed:{scope}'
+
+
+def _initial():
+    # После вытеснения ключа поколение не должно совпасть со старым.
+    return int(time.time() * 1000)
+
+
+def generation(scope):
+    """Текущее поколение ленты: часть ключа кэша её страниц."""
+
+    keys = [_key(GLOBAL), _key(scope)]
+    values = shared().get_many(keys)
+    missing = {key: _initial() for key in keys if key not in values}
+    if missing:
+        shared().set_many(missing, None)
+        values.update(missing)
+    return '.'.join(str(values[key]) for key in keys)
+
+
+def bump(*scopes):
+    """Сдвигает поколения лент: старые страницы больше не читаются.
+
+    Сигналы зовут bump() до коммита. Соседний запрос, пока запись не
+    видна, положил бы старую ленту под новое поколение, поэтому после
+    коммита поколения сдвигаются ещё раз.
+    """
+
+    scopes = set(scopes)
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            shared().incr(_key(scope))
+        except ValueError:
+            # Поколения ещё нет — его создаст первое чтение.
+            pass
+    now = int(time.time())
+    shared().set_many({_changed_key(scope): now for scope in scopes}, None)
+
+
+def last_modified(scope):
+    """Время последнего изменения ленты, unix-секунды.
+
+    Записывается в bump() рядом с поколением. Если ключ вытеснен,
+    считается, что лента изменилась сейчас: клиенты перезапросят её.
+    """
+
+    keys = [_changed_key(GLOBAL), _changed_key(scope)]
+    values = shared().get_many(keys)
+    missing = {
+        key: int(time.time()) for key in keys if key not in values}
+    if missing:
+        shared().set_many(missing, None)
+        values.update(missing)
+    return max(values.values())
+
+
+def replica_may_lag(scope):
+    """Запрос читает с реплики, а лента scope менялась только что.
+
+    Реплика могла ещё не получить запись, которая сдвинула поколение.
+    Такую страницу нельзя кэшировать под новым поколением и
+    подтверждать её ETag: устаревшая копия прожила бы до следующей
+    записи. Отставание реплик — не больше REPLICA_PIN_SECONDS, время
+    изменения хранится с точностью до секунды.
+    """
+
+    if not replicas.reading_replica():
+        return False
+    age = time.time() - last_modified(scope)
+    return age < settings.REPLICA_PIN_SECONDS + 1
+
+
+def post_scopes(author_id, *group_ids):
+    """Ленты, в которых показывается пост."""
+
+    scopes = ['index', TRENDING, f'profile:{author_id}']
+    scopes += [f'group:{pk}' for pk in group_ids if pk is not None]
+    return scopes
+
+
+def context(scope):
+    """Переменные для {% cache %} в шаблоне ленты."""
+
+    # Таймаут 0 — фрагмент рисуется, но не сохраняется
+    timeout = 0 if replica_may_lag(scope) else settings.FEED_CACHE_TIMEOUT
+    return {
+        'feed_generation': generation(scope),
+        'feed_cache_timeout': timeout,
+    }
@@ -0,0 +1,120 @@
+import time
+
+from core.cache import shared
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+
+from .models import Follow
+
+# Версии в общем кэше: всего графа сдвигается, когда подписки меняли в
+# обход сигналов, пользователя — при его подписке и отписке. Множества
+# лежат в кэше процесса под ключом из обеих версий.
+VERSION_KEY = 'follow-graph-version'
+
+
+def _user_version_key(user_id):
+    return f'{VERSION_KEY}:{user_id}'
+
+
+def _key(user_id):
+    keys = [VERSION_KEY, _user_version_key(user_id)]
+    versions = shared().get_many(keys)
+    # После вытеснения версия не должна совпасть со старой
+    missing = {
+        key: int(time.time() * 1000) for key in keys if key not in versions}
+    if missing:
+        shared().set_many(missing, None)
+        versions.update(missing)
+    return f'follow-graph:{versions[keys[0]]}.{versions[keys[1]]}:{user_id}'
+
+
+def _bump(key):
+    try:
+        shared().incr(key)
+    except ValueError:
+        # Версии ещё нет — её создаст первое чтение.
+        pass
+
+
+def _load(user_id):
+    return frozenset(Follow.objects.filter(
+        user_id=user_id).values_list('author_id', flat=True))
+
+
+def followees(user_id):
+    """id авторов, на которых подписан пользователь.
+
+    Хранится в кэше множеством; при промахе читается одним запросом.
+    """
+
+    if user_id is None:
+        return frozenset()
+    key = _key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = _load(user_id)
+        cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+    return ids
+
+
+def is_following(user, author_id):
+    """Подписан ли пользователь на автора; гость — ни на кого."""
+
+    if not user.is_authenticated:
+        return False
+    return author_id in followees(user.pk)
+
+
+def forget(user_id):
+    """Сбрасывает подписки пользователя во всех процессах.
+
+    Вызывается из сигналов. Множество не патчится: get и set не
+    атомарны, а соседний промах до коммита прочитал бы из базы старые
+    подписки и сохранил их. Поэтому версия сдвигается сразу и ещё раз
+    после коммита.
+    """
+
+    if user_id is None:
+        return
+    key = _user_version_key(user_id)
+    _bump(key)
+    transaction.on_commit(lambda: _bump(key))
+
+
+def invalidate():
+    """Сбрасывает весь граф: после массовой загрузки подписок."""
+
+    _bump(VERSION_KEY)
+
+
+def follow(user_id, author_id):
+    """Подписка одним INSERT; повтор или гонка — не ошибка.
+
+    Дубль отсекает UniqueConstraint, поэтому сигналы со счётчиками
+    срабатывают только у запроса, который действительно вставил строку.
+    """
+
+    try:
+        with transaction.atomic(using=router.db_for_write(Follow)):
+            Follow.objects.create(user_id=user_id, author_id=author_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user_id, author_id):
+    """Отписка; post_delete — только если строка была.
+
+    Удаление и сигналы со счётчиками и лентами идут в одной транзакции:
+    если приёмник упадёт, строка останется и повтор всё поправит.
+    """
+
+    with transaction.atomic(using=router.db_for_write(Follow)):
+        # Строка блокируется: из одновременных отписок удаляет одна
+        follow = Follow.objects.select_for_update().filter(
+            user_id=user_id, author_id=author_id).first()
+        if follow is None:
+            return False
+        follow.delete()
+    return True
@@ -32,3 +32,26 @@ class CommentForm(forms.ModelForm):
         if data == '':
             raise forms.ValidationError('Комментариев без текста не бывает...')
         return data
+
+
+class ExportForm(forms.Form):
+    """Фильтры выгрузки постов и комментариев."""
+
+    format = forms.ChoiceField(
+        choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')], required=False)
+    since = forms.DateField(required=False)
+    until = forms.DateField(required=False)
+    group = forms.SlugField(required=False)
+    author = forms.CharField(required=False)
+
+    def clean_format(self):
+
+        return self.cleaned_data['format'] or 'csv'
+
+    def filters(self):
+        """Фильтры для exports.queryset()."""
+
+        return {
+            name: self.cleaned_data[name]
+            for name in ('since', 'until', 'group', 'author')
+        }
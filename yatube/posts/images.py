@@ -0,0 +1,119 @@
+import logging
+
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+
+from . import counters, thumbnails
+from .models import ImageVariant, Post, StoredImage
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = Post._meta.get_field('image').upload_to
+storage = Post._meta.get_field('image').storage
+
+
+def acquire(name):
+    """Ещё один пост ссылается на файл; первую строку считаем с нуля."""
+
+    if not name:
+        return
+    if counters.bump(StoredImage.objects.filter(name=name), 'refs', 1):
+        return
+    refs = Post.objects.filter(image=name).count()
+    try:
+        with transaction.atomic():
+            StoredImage.objects.create(name=name, refs=refs)
+    except IntegrityError:
+        StoredImage.objects.filter(name=name).update(refs=refs)
+
+
+def release(name):
+    """Пост больше не ссылается на файл; сироту удалим после коммита.
+
+    Строка с нулём ссылок остаётся до collect(): загрузка той же
+    картинки в соседней транзакции увеличит её, а не создаст заново.
+    """
+
+    if not name:
+        return
+    with transaction.atomic():
+        image = StoredImage.objects.select_for_update().filter(
+            name=name).first()
+        if image is None or not image.refs:
+            return
+        image.refs -= 1
+        image.save(update_fields=['refs'])
+    if not image.refs:
+        transaction.on_commit(lambda: collect(name))
+
+
+def collect(name):
+    """Удаляет файл, если на него не осталось ссылок.
+
+    Решение принимается по строке StoredImage под блокировкой, в той же
+    транзакции, что удаляет строку и копии. Файлы удаляются только
+    после её коммита.
+    """
+
+    with transaction.atomic():
+        image = StoredImage.objects.select_for_update().filter(
+            name=name).first()
+        if image is None or image.refs:
+            return False
+        image.delete()
+        variants = _delete_variants(name)
+    _delete_files(name, variants)
+    return True
+
+
+def remove(name):
+    """Удаляет файл картинки вместе со всеми её копиями."""
+
+    _delete_files(name, _delete_variants(name))
+
+
+def _delete_variants(name):
+    variants = list(ImageVariant.objects.filter(source=name))
+    ImageVariant.objects.filter(source=name).delete()
+    return variants
+
+
+def _delete_files(name, variants):
+    cache.delete(thumbnails.cache_key(name))
+    try:
+        for variant in variants:
+            variant.file.delete(save=False)
+        storage.delete(name)
+    except (OSError, SuspiciousFileOperation):
+        logger.exception('Не удалось удалить картинку %s', name)
+
+
+def rebuild():
+    """Пересчитывает ссылки на файлы по постам."""
+
+    rows = (
+        Post.objects.exclude(image='').order_by()
+        .values('image').annotate(refs=Count('pk'))
+    )
+    with transaction.atomic():
+        StoredImage.objects.all().delete()
+        StoredImage.objects.bulk_create(
+            StoredImage(name=row['image'], refs=row['refs']) for row in rows)
+
+
+def orphans():
+    """Файлы в posts/ и копии, на которые не ссылается ни один пост."""
+
+    try:
+        files = storage.listdir(UPLOAD_DIR)[1]
+    except FileNotFoundError:
+        files = []
+    # *.upload — загрузки, которые пишутся прямо сейчас
+    names = {
+        UPLOAD_DIR + file for file in files if not file.endswith('.upload')
+    }
+    names.update(ImageVariant.objects.values_list('source', flat=True))
+    used = Post.objects.exclude(image='').values_list('image', flat=True)
+    return sorted(names - set(used))
@@ -0,0 +1,198 @@
+import csv
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .models import Comment, Follow, Group, ImportCheckpoint, Post, User
+
+# Порядок загрузки: комментарии и подписки ссылаются на посты и авторов
+KINDS = ('posts', 'comments', 'follows')
+BATCH_SIZE = 1000
+
+
+@contextmanager
+def explicit_dates(*models):
+    """Даёт задать даты при bulk_create, отключая auto_now_add."""
+
+    fields = [
+        field for model in models for field in model._meta.fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def read(path):
+    """Записи CSV или JSON Lines по одной, не читая файл целиком."""
+
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_date(value):
+    """Дата из ISO 8601; без даты — сейчас, без зоны — в TIME_ZONE."""
+
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Не разобрать дату {value!r}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def optional_id(value):
+    return int(value) if value not in (None, '') else None
+
+
+class Lookup:
+    """id пользователей и групп по именам, запомненные на весь импорт.
+
+    Недостающих создаёт пачкой: пользователей без пароля, группы —
+    с названием по слагу.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.groups = {}
+        self.created = {'users': 0, 'groups': 0}
+
+    def resolve(self, kind, model, field, names, make):
+        cache = getattr(self, kind)
+        missing = set(names) - set(cache) - {None, ''}
+        if missing:
+            cache.update(model.objects.filter(
+                **{f'{field}__in': missing}).values_list(field, 'pk'))
+        new = missing - set(cache)
+        if new:
+            model.objects.bulk_create([make(name) for name in new])
+            self.created[kind] += len(new)
+            cache.update(model.objects.filter(
+                **{f'{field}__in': new}).values_list(field, 'pk'))
+        return cache
+
+    def user_ids(self, usernames):
+        return self.resolve(
+            'users', User, 'username', usernames,
+            lambda name: User(username=name, password=make_password(None)))
+
+    def group_ids(self, slugs):
+        return self.resolve(
+            'groups', Group, 'slug', slugs,
+            lambda slug: Group(title=slug, slug=slug, description=''))
+
+
+class Importer:
+    """Загружает файлы пачками; каждая пачка — транзакция с отметкой.
+
+    Отметка ImportCheckpoint пишется в той же транзакции, что и строки,
+    поэтому после сбоя загрузка продолжается ровно с первой
+    незакоммиченной пачки. Строки с уже занятым id пропускаются.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.lookup = Lookup()
+
+    def run(self, kind, path, restart=False):
+        """Загружает файл; возвращает число строк, пропусков и секунд."""
+
+        source = f'{kind}:{os.path.abspath(path)}'
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+        if restart:
+            checkpoint.rows = 0
+        stats = {'resumed': checkpoint.rows, 'rows': 0, 'skipped': 0}
+        insert = getattr(self, f'insert_{kind}')
+        records = itertools.islice(read(path), checkpoint.rows, None)
+
+        started = time.perf_counter()
+        with explicit_dates(Post, Comment):
+            while True:
+                batch = list(itertools.islice(records, self.batch_size))
+                if not batch:
+                    break
+                with transaction.atomic(), search.triggers_paused():
+                    inserted = insert(batch)
+                    checkpoint.rows += len(batch)
+                    checkpoint.save()
+                stats['rows'] += len(batch)
+                stats['skipped'] += len(batch) - inserted
+        stats['seconds'] = time.perf_counter() - started
+        return stats
+
+    def insert_posts(self, batch):
+        users = self.lookup.user_ids(r['author'] for r in batch)
+        groups = self.lookup.group_ids(r.get('group') for r in batch)
+        ids = [optional_id(r.get('id')) for r in batch]
+        taken = set(Post.objects.filter(pk__in=ids).values_list(
+            'pk', flat=True))
+        posts = [
+            Post(
+                id=pk, text=r['text'], author_id=users[r['author']],
+                group_id=groups.get(r.get('group')),
+                pub_date=parse_date(r.get('pub_date')),
+                image=r.get('image') or '',
+            )
+            for pk, r in zip(ids, batch) if pk is None or pk not in taken
+        ]
+        Post.objects.bulk_create(posts)
+        return len(posts)
+
+    def insert_comments(self, batch):
+        users = self.lookup.user_ids(r['author'] for r in batch)
+        ids = [optional_id(r.get('id')) for r in batch]
+        taken = set(Comment.objects.filter(pk__in=ids).values_list(
+            'pk', flat=True))
+        post_ids = set(Post.objects.filter(
+            pk__in=[int(r['post_id']) for r in batch],
+        ).values_list('pk', flat=True))
+        comments = [
+            Comment(
+                id=pk, post_id=int(r['post_id']),
+                author_id=users[r['author']], text=r['text'],
+                created=parse_date(r.get('created')),
+            )
+            for pk, r in zip(ids, batch)
+            if (pk is None or pk not in taken)
+            and int(r['post_id']) in post_ids
+        ]
+        Comment.objects.bulk_create(comments)
+        return len(comments)
+
+    def insert_follows(self, batch):
+        users = self.lookup.user_ids(
+            itertools.chain.from_iterable(
+                (r['user'], r['author']) for r in batch))
+        pairs = {
+            (users[r['user']], users[r['author']]) for r in batch
+            if r['user'] != r['author']
+        }
+        existing = set(Follow.objects.filter(
+            user_id__in={user for user, _ in pairs},
+            author_id__in={author for _, author in pairs},
+        ).values_list('user_id', 'author_id'))
+        follows = [
+            Follow(user_id=user, author_id=author)
+            for user, author in pairs - existing
+        ]
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        return len(follows)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts import images
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает ссылки постов на файлы картинок и удаляет файлы '
+        'и копии, на которые никто не ссылается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать сирот, ничего не удаляя.',
+        )
+
+    def handle(self, *args, **options):
+        orphans = images.orphans()
+        for name in orphans:
+            self.stdout.write(name)
+        if options['dry_run']:
+            self.stdout.write(f'Сирот: {len(orphans)}')
+            return
+
+        images.rebuild()
+        for name in orphans:
+            images.remove(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Ссылки пересчитаны, удалено сирот: {len(orphans)}'))
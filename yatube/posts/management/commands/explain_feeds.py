@@ -0,0 +1,169 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+
+from posts.models import Comment, Follow, Group, Post, User
+
+FEED_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы (EXPLAIN) и время горячих запросов лент '
+        'с составными индексами и без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Сгенерировать столько постов (и столько же комментариев) '
+                 'перед замером, например 1000000.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Размер пачки bulk_create при генерации.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз выполнять каждый запрос для замера времени.',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.batch_size = options['batch_size']
+            self.seed(options['seed'])
+
+        queries = self.hot_queries()
+        if not queries:
+            self.stderr.write('База пуста: запустите с --seed N.')
+            return
+
+        self.report('С индексами', queries, options['repeat'])
+
+        with transaction.atomic():
+            self.drop_indexes()
+            self.report('Без индексов', queries, options['repeat'])
+            transaction.set_rollback(True)
+
+    def hot_queries(self):
+        """Запросы, которые выполняют index, group, profile и follow."""
+
+        post = Post.objects.order_by('?').first()
+        follow = Follow.objects.order_by('?').first()
+        group = Group.objects.order_by('?').first()
+        if post is None:
+            return {}
+
+        queries = {
+            'index': Post.objects.all()[:FEED_SIZE],
+            'profile': post.author.posts.all()[:FEED_SIZE],
+            'post_detail comments': post.comments.all(),
+        }
+        if group is not None:
+            queries['group_posts'] = group.posts.all()[:FEED_SIZE]
+        if follow is not None:
+            queries['follow_index'] = Post.objects.filter(
+                author__following__user=follow.user_id)[:FEED_SIZE]
+        return queries
+
+    def drop_indexes(self):
+        """Удаляет составные индексы внутри уже открытой транзакции."""
+
+        with connection.cursor() as cursor:
+            for model in (Post, Comment, Follow):
+                for index in model._meta.indexes:
+                    cursor.execute(
+                        'DROP INDEX %s' % connection.ops.quote_name(
+                            index.name))
+
+    def report(self, label, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        explain = (
+            'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite'
+            else 'EXPLAIN'
+        )
+        for name, queryset in queries.items():
+            sql, params = queryset.query.sql_with_params()
+            # Комментарий не даёт взять из кэша план, подготовленный
+            # до удаления индексов.
+            sql = f'/* {label} */ {sql}'
+            timings = []
+            with connection.cursor() as cursor:
+                cursor.execute(f'{explain} {sql}', params)
+                plan = cursor.fetchall()
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append(time.perf_counter() - started)
+
+            self.stdout.write(self.style.SQL_TABLE(
+                f'{name}: {statistics.median(timings) * 1000:.2f} ms'))
+            for row in plan:
+                self.stdout.write(f'    {row[-1]}')
+
+    def bulk_create(self, model, objs):
+        """bulk_create по пачкам, не держа весь генератор в памяти."""
+
+        objs = iter(objs)
+        while True:
+            batch = list(itertools.islice(objs, self.batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+
+    def seed(self, n_posts):
+        """Быстро наполняет базу: посты, комментарии и подписки."""
+
+        n_users = max(n_posts // 100, 2)
+        n_groups = max(n_posts // 10000, 1)
+        prefix = f'explain{int(time.time())}'
+
+        self.stdout.write(f'Генерация {n_posts} постов...')
+        self.bulk_create(
+            User,
+            (User(username=f'{prefix}_{i}', password='!')
+             for i in range(n_users)),
+        )
+        self.bulk_create(
+            Group,
+            (Group(title=f'{prefix} {i}', slug=f'{prefix}-{i}',
+                   description='')
+             for i in range(n_groups)),
+        )
+        user_ids = list(User.objects.filter(
+            username__startswith=prefix).values_list('id', flat=True))
+        group_ids = list(Group.objects.filter(
+            slug__startswith=prefix).values_list('id', flat=True))
+
+        first_id = (Post.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        with transaction.atomic():
+            self.bulk_create(
+                Post,
+                (Post(text=f'Пост {i}', author_id=random.choice(user_ids),
+                      group_id=random.choice(group_ids + [None]))
+                 for i in range(n_posts)),
+            )
+        last_id = Post.objects.aggregate(Max('id'))['id__max']
+
+        with transaction.atomic():
+            self.bulk_create(
+                Comment,
+                (Comment(text=f'Комментарий {i}',
+                         post_id=random.randint(first_id, last_id),
+                         author_id=random.choice(user_ids))
+                 for i in range(n_posts)),
+            )
+            self.bulk_create(
+                Follow,
+                (Follow(user_id=user_id, author_id=author_id)
+                 for user_id in user_ids
+                 for author_id in random.sample(
+                     user_ids, min(20, len(user_ids)))
+                 if author_id != user_id),
+            )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Сворачивает законченные корзины активности в счёт вкладки '
+        '«В тренде». Запускается по расписанию раз в '
+        'TRENDING_BUCKET_SECONDS: корзины старше окна не учитываются.'
+    )
+
+    def handle(self, *args, **options):
+        posts = trending.fold()
+        self.stdout.write(self.style.SUCCESS(
+            f'Свёрнуто постов: {posts}'))
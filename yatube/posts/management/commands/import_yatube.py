@@ -0,0 +1,99 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from posts import (
+    counters, feed, feed_cache, follow_graph, images, imports, search)
+from posts.models import Comment, Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты, комментарии и подписки из CSV или JSON Lines '
+        'пачками bulk_create. Счётчики, ленты и поисковый индекс '
+        'пересчитываются один раз в конце. Прерванная загрузка '
+        'продолжается с последней пачки.'
+    )
+
+    def add_arguments(self, parser):
+        for kind in imports.KINDS:
+            parser.add_argument(
+                f'--{kind}', metavar='FILE',
+                help='Файл .csv или .jsonl.',
+            )
+        parser.add_argument(
+            '--batch-size', type=int, default=imports.BATCH_SIZE,
+            help='Строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Читать файлы с начала, не глядя на отметки прогресса.',
+        )
+
+    def handle(self, *args, **options):
+        files = [
+            (kind, options[kind]) for kind in imports.KINDS if options[kind]]
+        if not files:
+            raise CommandError(
+                'Укажите хотя бы один файл: --posts, --comments, --follows.')
+
+        importer = imports.Importer(options['batch_size'])
+        try:
+            for kind, path in files:
+                try:
+                    stats = importer.run(kind, path, options['restart'])
+                except OSError as error:
+                    raise CommandError(error)
+                self.stdout.write(self.format_stats(kind, stats))
+        finally:
+            self.finish()
+        created = importer.lookup.created
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Новых пользователей {created["users"]}, '
+            f'групп {created["groups"]}.'))
+
+    def format_stats(self, kind, stats):
+        rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+        resumed = (
+            f', продолжено со строки {stats["resumed"]}'
+            if stats['resumed'] else ''
+        )
+        return (
+            f'{kind}: строк {stats["rows"]}, пропущено {stats["skipped"]}, '
+            f'{rate:.0f} строк/с{resumed}'
+        )
+
+    def finish(self):
+        """Всё, что при обычном сохранении делают сигналы."""
+
+        steps = (
+            ('счётчики', counters.rebuild),
+            ('ленты', feed.rebuild),
+            ('картинки', images.rebuild),
+            ('поиск', self.rebuild_search),
+            ('последовательности id', self.reset_sequences),
+        )
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            self.stdout.write(
+                f'Пересчёт: {name} за {time.perf_counter() - started:.1f} с')
+        follow_graph.invalidate()
+        feed_cache.bump(feed_cache.GLOBAL)
+
+    def rebuild_search(self):
+        if search.available():
+            with transaction.atomic():
+                search.install_triggers()
+                search.reindex()
+
+    def reset_sequences(self):
+        """Строки вставлены с явными id: счётчики id в базе отстали."""
+
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Group, Post, Comment])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт копии всех картинок постов для srcset в несколько '
+        'потоков, чтобы первый читатель не ждал их в запросе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            default=max(settings.THUMBNAIL_WORKERS, 1),
+            help='Число потоков.',
+        )
+
+    def handle(self, *args, **options):
+        names = (
+            Post.objects.exclude(image='')
+            .order_by().values_list('image', flat=True).distinct()
+        )
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(
+                thumbnails.generate_in_thread, names.iterator()))
+
+        failed = results.count(False)
+        self.stdout.write(self.style.SUCCESS(
+            f'Картинок готово: {len(results) - failed}'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Ошибок: {failed}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов, комментариев и подписчиков '
+        'пачками UPDATE и показывает расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить расхождения, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.rebuild(check=options['check'])
+        for name, rows in drift.items():
+            style = self.style.WARNING if rows else self.style.SUCCESS
+            self.stdout.write(style(f'{name}: {rows}'))
+
+        total = sum(drift.values())
+        if options['check'] and total:
+            raise CommandError(f'Счётчики разошлись в {total} строках.')
+        if not options['check']:
+            self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
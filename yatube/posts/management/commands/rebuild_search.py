@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов и комментариев.'
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError(
+                'Полнотекстовый поиск работает только с SQLite.')
+
+        with transaction.atomic():
+            search.install_triggers()
+            rows = search.reindex()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано: {rows}'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает подсказки «кого почитать» для пользователей, '
+        'чьи подписки или подписки их авторов менялись. Запускается '
+        'по расписанию; после import_yatube — с --full.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать всех пользователей, а не только отмеченных.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users, created = recommendations.refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {users}, подсказок: {created}, '
+            f'за {time.perf_counter() - started:.1f} с'
+        ))
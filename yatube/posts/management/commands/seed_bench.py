@@ -0,0 +1,208 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from posts import counters, feed, feed_cache
+from posts.imports import explicit_dates
+from posts.models import Comment, Follow, Group, Post, User
+
+# Фраз Faker заготавливается заранее: генерировать каждую слишком дорого
+TEXT_POOL = 2000
+
+
+def zipf_weights(n, alpha):
+    """Накопленные веса степенного распределения для random.choices."""
+
+    return list(itertools.accumulate(
+        1 / (rank ** alpha) for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу данными для нагрузочных замеров: пользователи, '
+        'группы, посты, комментарии и степенной граф подписок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного закона популярности авторов.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней разбросать даты постов.',
+        )
+        parser.add_argument(
+            '--prefix', default='bench',
+            help='Префикс имён пользователей и слагов групп.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Сначала удалить данные прошлого запуска с этим префиксом.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        self.texts = [fake.paragraph(nb_sentences=3) for _ in range(TEXT_POOL)]
+        self.names = [
+            (fake.first_name(), fake.last_name()) for _ in range(TEXT_POOL)]
+
+        existing = User.objects.filter(username__startswith=f'{self.prefix}_')
+        if existing.exists():
+            if not options['clear']:
+                raise CommandError(
+                    f'Данные с префиксом {self.prefix} уже есть: '
+                    'добавьте --clear или смените --prefix.')
+            self.stdout.write('Удаление прошлых данных...')
+            existing.delete()
+            Group.objects.filter(slug__startswith=f'{self.prefix}-').delete()
+
+        with explicit_dates(Post, Comment):
+            user_ids = self.seed_users(options['users'])
+            group_ids = self.seed_groups(options['groups'])
+            # Активность и популярность авторов случайны и независимы:
+            # иначе ленты самых читаемых авторов раздуваются в разы.
+            weights = zipf_weights(len(user_ids), options['alpha'])
+            writers = self.random.sample(user_ids, len(user_ids))
+            post_ids = self.seed_posts(
+                options['posts'], writers, weights, group_ids,
+                options['days'])
+            self.seed_comments(
+                options['comments'], post_ids, user_ids, options['days'])
+            celebrities = self.random.sample(user_ids, len(user_ids))
+            self.seed_follows(
+                user_ids, celebrities, weights, options['follows'])
+
+        self.stdout.write('Пересчёт счётчиков и лент...')
+        counters.rebuild()
+        feed_items = feed.rebuild()
+        feed_cache.bump(feed_cache.GLOBAL)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: пользователей {len(user_ids)}, групп {len(group_ids)}, '
+            f'постов {options["posts"]}, комментариев {options["comments"]}, '
+            f'подписок {self.n_follows}, записей лент {feed_items}.'))
+
+    def bulk_create(self, model, objs):
+        """bulk_create по пачкам, не держа весь генератор в памяти."""
+
+        objs = iter(objs)
+        with transaction.atomic():
+            while True:
+                batch = list(itertools.islice(objs, self.batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch)
+
+    def text(self):
+        return self.random.choice(self.texts)
+
+    def seed_users(self, n):
+        self.stdout.write(f'Пользователи: {n}')
+        self.bulk_create(User, (
+            User(username=f'{self.prefix}_{i}', password='!',
+                 first_name=first_name, last_name=last_name)
+            for i in range(n)
+            for first_name, last_name in [self.random.choice(self.names)]
+        ))
+        return list(User.objects.filter(
+            username__startswith=f'{self.prefix}_'
+        ).values_list('id', flat=True))
+
+    def seed_groups(self, n):
+        self.stdout.write(f'Группы: {n}')
+        self.bulk_create(Group, (
+            Group(title=f'Группа {i}', slug=f'{self.prefix}-{i}',
+                  description=self.text())
+            for i in range(n)
+        ))
+        return list(Group.objects.filter(
+            slug__startswith=f'{self.prefix}-'
+        ).values_list('id', flat=True))
+
+    def seed_posts(self, n, authors, weights, group_ids, days):
+        """Посты пишут в основном популярные авторы, треть — без группы."""
+
+        self.stdout.write(f'Посты: {n}')
+        now = timezone.now()
+        span = days * 24 * 60 * 60
+        groups = group_ids + [None] * (len(group_ids) // 2 or 1)
+        first_id = (Post.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+        def posts():
+            for start in range(0, n, self.batch_size):
+                size = min(self.batch_size, n - start)
+                for author_id in self.random.choices(
+                        authors, cum_weights=weights, k=size):
+                    yield Post(
+                        text=self.text(), author_id=author_id,
+                        group_id=self.random.choice(groups),
+                        pub_date=now - timedelta(
+                            seconds=self.random.randrange(span)),
+                    )
+
+        self.bulk_create(Post, posts())
+        last_id = Post.objects.aggregate(Max('id'))['id__max'] or 0
+        return range(first_id, last_id + 1)
+
+    def seed_comments(self, n, post_ids, user_ids, days):
+        self.stdout.write(f'Комментарии: {n}')
+        if not post_ids:
+            return
+        now = timezone.now()
+        span = days * 24 * 60 * 60
+        self.bulk_create(Comment, (
+            Comment(text=self.text(),
+                    post_id=self.random.choice(post_ids),
+                    author_id=self.random.choice(user_ids),
+                    created=now - timedelta(
+                        seconds=self.random.randrange(span)))
+            for _ in range(n)
+        ))
+
+    def seed_follows(self, user_ids, authors, weights, mean):
+        """Число подписок по Парето, на кого — по степенному закону."""
+
+        self.stdout.write(f'Подписки: в среднем {mean} на пользователя')
+        self.n_follows = 0
+
+        def follows():
+            for user_id in user_ids:
+                # Среднее у Парето с alpha = 1.5 равно 3
+                k = min(round(self.random.paretovariate(1.5) * mean / 3),
+                        len(user_ids) - 1)
+                chosen = set()
+                # Популярных авторов выбирают повторно: добираем до k,
+                # но не бесконечно, хвост распределения тонкий.
+                for _ in range(5):
+                    chosen.update(self.random.choices(
+                        authors, cum_weights=weights, k=k - len(chosen)))
+                    chosen.discard(user_id)
+                    if len(chosen) >= k:
+                        break
+                self.n_follows += len(chosen)
+                for author_id in chosen:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        self.bulk_create(Follow, follows())
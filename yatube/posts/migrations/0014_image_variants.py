@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100, verbose_name='исходная картинка')),
+                ('width', models.PositiveSmallIntegerField(verbose_name='ширина')),
+                ('height', models.PositiveSmallIntegerField(verbose_name='высота')),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=4, verbose_name='формат')),
+                ('file', models.ImageField(upload_to='posts/variants/', verbose_name='файл')),
+            ],
+            options={
+                'verbose_name': 'копия картинки',
+                'verbose_name_plural': 'копии картинок',
+                'ordering': ['source', 'format', 'width'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagevariant',
+            constraint=models.UniqueConstraint(fields=('source', 'width', 'format'), name='unique_image_variant'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(n=Count('pk')).values('n')
+    ), 0)
+
+
+def dedupe_follows(apps, schema_editor):
+    """Оставляет по одной подписке на пару, убирает пустые и на себя.
+
+    Подписка на себя разослала автору его же посты: эти записи ленты
+    удаляются вместе с ней. У дублей остаётся одна подписка, их записи
+    верны.
+    """
+
+    Follow = apps.get_model('posts', 'Follow')
+    FeedItem = apps.get_model('posts', 'FeedItem')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    Follow.objects.filter(user__isnull=True).delete()
+    Follow.objects.filter(user=F('author')).delete()
+    FeedItem.objects.filter(user=F('post__author')).delete()
+    keep = (
+        Follow.objects.order_by().values('user', 'author')
+        .annotate(keep=Min('pk')).values_list('keep', flat=True)
+    )
+    Follow.objects.exclude(pk__in=list(keep)).delete()
+    AuthorStats.objects.update(
+        followers_count=count_subquery(Follow, 'author'),
+        following_count=count_subquery(Follow, 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0016_import_checkpoints'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_follows, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='follow',
+            name='follow_user_author_idx',
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='follower', to=settings.AUTH_USER_MODEL, verbose_name='подписчик'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='follow_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(_negated=True, user=models.F('author')), name='follow_not_self'),
+        ),
+    ]
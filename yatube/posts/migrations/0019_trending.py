@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingGroup',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Group', verbose_name='группа')),
+                ('score', models.FloatField(verbose_name='счёт')),
+                ('updated', models.DateTimeField(verbose_name='счёт на момент')),
+            ],
+            options={
+                'verbose_name': 'группа в тренде',
+                'verbose_name_plural': 'группы в тренде',
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='пост')),
+                ('score', models.FloatField(verbose_name='счёт')),
+                ('updated', models.DateTimeField(verbose_name='счёт на момент')),
+            ],
+            options={
+                'verbose_name': 'пост в тренде',
+                'verbose_name_plural': 'посты в тренде',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingpost',
+            index=models.Index(fields=['-score'], name='trendingpost_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trendinggroup',
+            index=models.Index(fields=['-score'], name='trendinggroup_score_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.IntegerField(verbose_name='корзина')),
+                ('count', models.IntegerField(verbose_name='вес событий')),
+                ('group', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='posts.Group', verbose_name='группа')),
+                ('post', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='posts.Post', verbose_name='пост')),
+            ],
+            options={
+                'verbose_name': 'активность для тренда',
+                'verbose_name_plural': 'активность для тренда',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingactivity',
+            constraint=models.UniqueConstraint(fields=('bucket', 'post'), name='trending_activity_unique'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_trending_activity'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='TrendingActivity',
+        ),
+    ]
@@ -1,10 +1,30 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
-class Group(models.Model):
+class CountersMixin:
+    """Обычный save() не перезаписывает счётчики устаревшими значениями.
+
+    Счётчики меняются только F()-обновлениями из posts.counters.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Group(CountersMixin, models.Model):
     """Модель групп."""
 
     def __str__(self):
@@ -22,13 +42,20 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='описание группы',
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='число постов',
+    )
+
+    counter_fields = ('posts_count',)
 
     class Meta:
         verbose_name = 'группа'
         verbose_name_plural = 'группы'
 
 
-class Post(models.Model):
+class Post(CountersMixin, models.Model):
     """Модель постов."""
 
     def __str__(self):
@@ -60,13 +87,44 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name='картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='число комментариев',
+    )
+
+    counter_fields = ('comments_count',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: при её смене переносим счётчики.
+        if 'group_id' in instance.__dict__:
+            instance._loaded_group_id = instance.group_id
+        # Картинка на момент загрузки: при замене отпускаем старую.
+        if 'image' in instance.__dict__:
+            instance._loaded_image = instance.__dict__['image'] or ''
+        return instance
 
     class Meta:
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -99,6 +157,10 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created'], name='comment_post_created_idx'),
+        ]
 
 
 class Follow(models.Model):
@@ -107,7 +169,6 @@ class Follow(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        null=True,
         related_name='follower',
         verbose_name='подписчик'
     )
@@ -121,3 +182,277 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'подписчик'
         verbose_name_plural = 'подписчики'
+        constraints = [
+            # Индекс ограничения заменяет прежний (user, author)
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='follow_unique'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='follow_not_self'),
+        ]
+
+
+class AuthorStats(models.Model):
+    """Модель счётчиков пользователя (денормализация для профиля)."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число постов',
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число комментариев',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число подписчиков',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число подписок',
+    )
+
+    class Meta:
+        verbose_name = 'счётчики пользователя'
+        verbose_name_plural = 'счётчики пользователей'
+
+
+class FeedItem(models.Model):
+    """Модель ленты подписок: пост, разосланный подписчику."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='пост'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='дата создания поста',
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_feed_item'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-id'],
+                name='feeditem_user_pub_date_idx',
+            ),
+        ]
+
+
+class FeedPullAuthor(models.Model):
+    """Модель авторов, чьи посты не рассылаются по лентам.
+
+    У таких авторов слишком много подписчиков, поэтому их посты
+    подмешиваются в ленту подписок при чтении.
+    """
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_pull',
+        verbose_name='автор'
+    )
+
+    class Meta:
+        verbose_name = 'автор без рассылки'
+        verbose_name_plural = 'авторы без рассылки'
+
+
+class ImageVariant(models.Model):
+    """Модель уменьшенной копии картинки поста для srcset.
+
+    Копии привязаны к имени файла, а не к посту: одна картинка может
+    принадлежать нескольким постам.
+    """
+
+    FORMATS = (
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    )
+
+    source = models.CharField(
+        max_length=100,
+        verbose_name='исходная картинка',
+    )
+    width = models.PositiveSmallIntegerField(
+        verbose_name='ширина',
+    )
+    height = models.PositiveSmallIntegerField(
+        verbose_name='высота',
+    )
+    format = models.CharField(
+        max_length=4,
+        choices=FORMATS,
+        verbose_name='формат',
+    )
+    file = models.ImageField(
+        upload_to='posts/variants/',
+        verbose_name='файл',
+    )
+
+    class Meta:
+        verbose_name = 'копия картинки'
+        verbose_name_plural = 'копии картинок'
+        ordering = ['source', 'format', 'width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'width', 'format'],
+                name='unique_image_variant',
+            ),
+        ]
+
+
+class StoredImage(models.Model):
+    """Модель файла картинки: сколько постов на него ссылается."""
+
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='файл',
+    )
+    refs = models.PositiveIntegerField(
+        default=0,
+        verbose_name='число ссылок',
+    )
+
+    class Meta:
+        verbose_name = 'файл картинки'
+        verbose_name_plural = 'файлы картинок'
+
+
+class ImportCheckpoint(models.Model):
+    """Модель прогресса import_yatube: сколько строк файла загружено."""
+
+    source = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='источник',
+    )
+    rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='загружено строк',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='обновлено',
+    )
+
+    class Meta:
+        verbose_name = 'прогресс импорта'
+        verbose_name_plural = 'прогресс импорта'
+
+
+class Recommendation(models.Model):
+    """Модель подсказки «кого почитать», посчитанной командой."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommended_to',
+        verbose_name='автор'
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name='место',
+    )
+    score = models.PositiveIntegerField(
+        verbose_name='вес',
+    )
+
+    class Meta:
+        verbose_name = 'рекомендация'
+        verbose_name_plural = 'рекомендации'
+        constraints = [
+            # Индекс ограничения отдаёт подсказки по порядку одним чтением
+            models.UniqueConstraint(
+                fields=['user', 'rank'], name='recommendation_user_rank'),
+        ]
+
+
+class RecommendationChange(models.Model):
+    """Модель отметки: подписки пользователя менялись после пересчёта."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='пользователь'
+    )
+
+    class Meta:
+        verbose_name = 'изменение подписок'
+        verbose_name_plural = 'изменения подписок'
+
+
+class TrendingPost(models.Model):
+    """Модель затухающего счёта активности поста для вкладки «В тренде»."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='пост'
+    )
+    score = models.FloatField(
+        verbose_name='счёт',
+    )
+    updated = models.DateTimeField(
+        verbose_name='счёт на момент',
+    )
+
+    class Meta:
+        verbose_name = 'пост в тренде'
+        verbose_name_plural = 'посты в тренде'
+        indexes = [
+            models.Index(fields=['-score'], name='trendingpost_score_idx'),
+        ]
+
+
+class TrendingGroup(models.Model):
+    """Модель затухающего счёта активности группы."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='группа'
+    )
+    score = models.FloatField(
+        verbose_name='счёт',
+    )
+    updated = models.DateTimeField(
+        verbose_name='счёт на момент',
+    )
+
+    class Meta:
+        verbose_name = 'группа в тренде'
+        verbose_name_plural = 'группы в тренде'
+        indexes = [
+            models.Index(fields=['-score'], name='trendinggroup_score_idx'),
+        ]
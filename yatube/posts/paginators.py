@@ -0,0 +1,127 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class CursorPage(Page):
+    """Страница ленты, построенная по курсору.
+
+    Номера страницы и общего числа страниц у неё нет: шаблон рисует
+    только ссылки «новее»/«старее».
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, cursor,
+                 has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self.cursor = cursor
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        # repr попадает в ключ {% cache %}, поэтому без запросов к базе.
+        return '<CursorPage %s>' % ':'.join(self.cursor)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Курсор для ссылки на более старые записи."""
+
+        if self._has_next and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return ''
+
+    @property
+    def previous_cursor(self):
+        """Курсор для ссылки на более новые записи."""
+
+        if self._has_previous and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return ''
+
+
+class CursorPaginator(Paginator):
+    """Паджинатор по ключу (field, tiebreak) без COUNT и OFFSET.
+
+    Записи идут от новых к старым. Курсор указывает на крайнюю запись
+    уже показанной страницы, поэтому новые посты, добавленные во время
+    листания, не сдвигают и не дублируют следующие страницы.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 tiebreak='id'):
+        super().__init__(object_list, per_page)
+        self.field = field
+        self.tiebreak = tiebreak
+
+    def encode_cursor(self, obj):
+        # Строки .values() приходят словарями
+        if isinstance(obj, dict):
+            value, pk = obj[self.field], obj[self.tiebreak]
+        else:
+            value, pk = getattr(obj, self.field), getattr(obj, self.tiebreak)
+        return urlsafe_base64_encode(f'{value.isoformat()}|{pk}'.encode())
+
+    def decode_cursor(self, cursor):
+        """Возвращает (значение поля, id) или None для битого курсора."""
+
+        try:
+            value, pk = force_str(
+                urlsafe_base64_decode(cursor)).rsplit('|', 1)
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        return value, pk
+
+    def get_page(self, after=None, before=None):
+        """Страница старее `after` или новее `before`.
+
+        Без курсора (или с битым курсором) отдаётся первая страница.
+        """
+
+        field, tiebreak = self.field, self.tiebreak
+        key = self.decode_cursor(before) if before else None
+        if key is not None:
+            value, pk = key
+            # Первое условие — граница поиска по индексу (..., field, id)
+            queryset = self.object_list.filter(
+                Q(**{f'{field}__gte': value}),
+                Q(**{f'{field}__gt': value})
+                | Q(**{field: value, f'{tiebreak}__gt': pk}),
+            ).order_by(field, tiebreak)
+            direction, cursor = 'before', before
+        else:
+            key = self.decode_cursor(after) if after else None
+            queryset = self.object_list.order_by(
+                f'-{field}', f'-{tiebreak}')
+            if key is not None:
+                value, pk = key
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lte': value}),
+                    Q(**{f'{field}__lt': value})
+                    | Q(**{field: value, f'{tiebreak}__lt': pk}),
+                )
+            direction, cursor = 'after', after if key else ''
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == 'before':
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return CursorPage(
+            object_list, self, (direction, cursor), has_next, has_previous)
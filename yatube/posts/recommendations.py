@@ -0,0 +1,164 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import feed_cache
+from .models import (
+    FeedPullAuthor, Follow, Recommendation, RecommendationChange, User,
+)
+
+# Сколько подсказок показывать на странице
+SHOWN = 5
+# Подписка друга — сигнал сильнее, чем совпадение вкусов
+FRIEND_WEIGHT = 2
+# Пользователей за один проход: каждый — параметр IN (…)
+BATCH_SIZE = 500
+
+# Друзья друзей: на кого подписаны мои подписки
+FRIENDS_SQL = (
+    'SELECT f1.user_id, f2.author_id, COUNT(*) '
+    'FROM {follow} f1 JOIN {follow} f2 ON f2.user_id = f1.author_id '
+    'WHERE f1.user_id IN ({ids}) '
+    'GROUP BY f1.user_id, f2.author_id'
+)
+# Совместные подписки: на кого ещё подписаны читатели моих авторов.
+# Авторы без рассылки читают все подряд, о вкусе они не говорят.
+CO_FOLLOW_SQL = (
+    'SELECT f1.user_id, f3.author_id, COUNT(*) '
+    'FROM {follow} f1 '
+    'JOIN {follow} f2 ON f2.author_id = f1.author_id '
+    'AND f2.user_id <> f1.user_id '
+    'JOIN {follow} f3 ON f3.user_id = f2.user_id '
+    'WHERE f1.user_id IN ({ids}) AND f1.author_id NOT IN '
+    '(SELECT author_id FROM {pull}) '
+    'GROUP BY f1.user_id, f3.author_id'
+)
+
+
+def mark(*user_ids):
+    """Отмечает, что подписки пользователей изменились."""
+
+    RecommendationChange.objects.bulk_create(
+        [RecommendationChange(user_id=pk) for pk in user_ids])
+
+
+def affected(user_ids):
+    """Чьи подсказки зависят от подписок user_ids.
+
+    Сами пользователи и их подписчики: у подписчиков меняются друзья
+    друзей и совместные подписки через этого пользователя.
+    """
+
+    users = set(user_ids)
+    users.update(Follow.objects.filter(
+        author_id__in=user_ids).values_list('user_id', flat=True))
+    return users
+
+
+def scores(user_ids):
+    """Вес каждого кандидата для каждого пользователя из user_ids."""
+
+    result = defaultdict(Counter)
+    tables = {
+        'follow': Follow._meta.db_table,
+        'pull': FeedPullAuthor._meta.db_table,
+        'ids': ', '.join(['%s'] * len(user_ids)),
+    }
+    with connection.cursor() as cursor:
+        for sql, weight in ((FRIENDS_SQL, FRIEND_WEIGHT),
+                            (CO_FOLLOW_SQL, 1)):
+            cursor.execute(sql.format(**tables), list(user_ids))
+            for user_id, author_id, n in cursor.fetchall():
+                result[user_id][author_id] += n * weight
+    return result
+
+
+def top(candidates, followed, user_id, n):
+    """Лучшие n кандидатов без себя и уже читаемых авторов."""
+
+    return heapq.nsmallest(
+        n,
+        (
+            (-score, author_id) for author_id, score in candidates.items()
+            if author_id != user_id and author_id not in followed
+        ),
+    )
+
+
+def compute(user_ids):
+    """Пересчитывает и сохраняет подсказки пользователей."""
+
+    user_ids = list(user_ids)
+    weights = scores(user_ids)
+    followed = defaultdict(set)
+    for user_id, author_id in Follow.objects.filter(
+            user_id__in=user_ids).values_list('user_id', 'author_id'):
+        followed[user_id].add(author_id)
+    rows = [
+        Recommendation(
+            user_id=user_id, author_id=author_id, rank=rank,
+            score=-negative)
+        for user_id in user_ids
+        for rank, (negative, author_id) in enumerate(top(
+            weights[user_id], followed[user_id], user_id,
+            settings.RECOMMENDATIONS_PER_USER,
+        ))
+    ]
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=user_ids).delete()
+        Recommendation.objects.bulk_create(rows)
+    # Подсказки видны на своей странице профиля
+    feed_cache.bump(*(f'profile:{pk}' for pk in user_ids))
+    return len(rows)
+
+
+def batches(user_ids):
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        yield user_ids[start:start + BATCH_SIZE]
+
+
+def refresh(full=False):
+    """Пересчёт подсказок; возвращает (пользователей, подсказок).
+
+    По умолчанию — только окрестности отмеченных пользователей.
+    Отметки, появившиеся во время пересчёта, остаются до следующего.
+    """
+
+    last = RecommendationChange.objects.order_by('-pk').values_list(
+        'pk', flat=True).first()
+    if full:
+        users = set(User.objects.values_list('pk', flat=True))
+    elif last is None:
+        return 0, 0
+    else:
+        changed = set(RecommendationChange.objects.filter(
+            pk__lte=last).values_list('user_id', flat=True))
+        users = set()
+        for batch in batches(changed):
+            users |= affected(batch)
+    created = sum(compute(batch) for batch in batches(users))
+    if last is not None:
+        RecommendationChange.objects.filter(pk__lte=last).delete()
+    return len(users), created
+
+
+def for_user(user):
+    """Подсказки для страницы: одно чтение по индексу (user, rank).
+
+    Авторов, на которых подписались после пересчёта, отсеивает
+    подзапрос в том же запросе.
+    """
+
+    if not user.is_authenticated:
+        return []
+    return [
+        row.author for row in
+        Recommendation.objects.filter(user=user)
+        .exclude(author__in=Follow.objects.filter(
+            user=user).values('author_id'))
+        .select_related('author', 'author__stats')
+        .order_by('rank')[:SHOWN]
+    ]
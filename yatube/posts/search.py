@@ -0,0 +1,206 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+# Виртуальная таблица FTS5. rowid = id * 2 для поста и id * 2 + 1 для
+# комментария: так триггеры обновляют запись по rowid без поиска.
+TABLE = 'posts_search'
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+SNIPPET_TOKENS = 16
+
+TRIGGERS = {
+    'posts_post_search_ai': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_search(rowid, text, post_id) '
+        'VALUES (new.id * 2, new.text, new.id); END'
+    ),
+    'posts_post_search_au': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        'UPDATE posts_search SET text = new.text '
+        'WHERE rowid = new.id * 2; END'
+    ),
+    'posts_post_search_ad': (
+        'AFTER DELETE ON posts_post BEGIN '
+        'DELETE FROM posts_search WHERE rowid = old.id * 2; END'
+    ),
+    'posts_comment_search_ai': (
+        'AFTER INSERT ON posts_comment BEGIN '
+        'INSERT INTO posts_search(rowid, text, post_id) '
+        'VALUES (new.id * 2 + 1, new.text, new.post_id); END'
+    ),
+    'posts_comment_search_au': (
+        'AFTER UPDATE OF text ON posts_comment BEGIN '
+        'UPDATE posts_search SET text = new.text '
+        'WHERE rowid = new.id * 2 + 1; END'
+    ),
+    'posts_comment_search_ad': (
+        'AFTER DELETE ON posts_comment BEGIN '
+        'DELETE FROM posts_search WHERE rowid = old.id * 2 + 1; END'
+    ),
+}
+
+
+def available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_triggers(using=connection):
+    """Создаёт триггеры синхронизации индекса, если их нет.
+
+    SQLite пересоздаёт таблицу при многих ALTER в миграциях и теряет
+    триггеры, поэтому вызывается после каждого migrate.
+    """
+
+    if not available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [TABLE],
+        )
+        if cursor.fetchone() is None:
+            return
+        for name, body in TRIGGERS.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+
+def drop_triggers(using=connection):
+    """Снимает триггеры синхронизации индекса."""
+
+    if not available(using):
+        return
+    with using.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+@contextmanager
+def triggers_paused(using=connection):
+    """Снимает триггеры на время пачки массовой загрузки.
+
+    Вызывается внутри её транзакции. DDL в SQLite транзакционен: другие
+    соединения триггеров не теряют, а сбой или убитый процесс
+    откатывает их снятие. Индекс потом перестраивает reindex().
+    """
+
+    drop_triggers(using)
+    yield
+    install_triggers(using)
+
+
+def reindex():
+    """Полностью перестраивает индекс из постов и комментариев."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(
+            f'INSERT INTO {TABLE}(rowid, text, post_id) '
+            'SELECT id * 2, text, id FROM posts_post'
+        )
+        cursor.execute(
+            f'INSERT INTO {TABLE}(rowid, text, post_id) '
+            'SELECT id * 2 + 1, text, post_id FROM posts_comment'
+        )
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
+
+
+def to_match(query):
+    """Запрос пользователя → выражение MATCH: все слова, по префиксу."""
+
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и размечает совпадения тегом <mark>."""
+
+    return mark_safe(
+        escape(snippet)
+        .replace(SNIPPET_START, '<mark>')
+        .replace(SNIPPET_END, '</mark>')
+    )
+
+
+def matching_post_ids(query):
+    """Подзапрос id постов, в тексте которых есть запрос (для админки)."""
+
+    return RawSQL(
+        f'SELECT rowid / 2 FROM {TABLE} '
+        f'WHERE {TABLE} MATCH %s AND (rowid & 1) = 0',
+        [to_match(query)],
+    )
+
+
+class SearchHit:
+    """Найденный пост или комментарий с подсвеченным фрагментом."""
+
+    def __init__(self, rowid, post_id, snippet, rank):
+        self.kind = 'comment' if rowid & 1 else 'post'
+        self.object_id = rowid // 2
+        self.post_id = post_id
+        self.snippet = highlight(snippet)
+        self.rank = rank
+        self.post = None
+
+
+class SearchResults:
+    """Ранжированная выдача FTS5, которую понимает Paginator.
+
+    Срез выполняет запрос с LIMIT/OFFSET и одним запросом подтягивает
+    посты, к которым относятся совпадения.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.match = to_match(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {TABLE} WHERE {TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        start = index.start or 0
+        limit = -1 if index.stop is None else index.stop - start
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, post_id, '
+                f'snippet({TABLE}, 0, %s, %s, %s, %s), bm25({TABLE}) '
+                f'FROM {TABLE} WHERE {TABLE} MATCH %s '
+                f'ORDER BY bm25({TABLE}) LIMIT %s OFFSET %s',
+                [SNIPPET_START, SNIPPET_END, '…', SNIPPET_TOKENS,
+                 self.match, limit, start],
+            )
+            hits = [SearchHit(*row) for row in cursor.fetchall()]
+
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            {hit.post_id for hit in hits})
+        for hit in hits:
+            hit.post = posts.get(hit.post_id)
+        return [hit for hit in hits if hit.post is not None]
+
+
+def search(query):
+    """Ранжированный поиск по постам и комментариям."""
+
+    return SearchResults(query)
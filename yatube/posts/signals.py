@@ -0,0 +1,132 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import (
+    counters, feed, feed_cache, follow_graph, images, recommendations, search,
+    trending,
+)
+from .models import Comment, Follow, Group, Post, User
+
+# Поля пользователя, которые видны в лентах
+USER_FEED_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """Рассылка по лентам, счётчики, ссылки на картинку, сброс кэша."""
+
+    if raw:
+        return
+    old_group_id = getattr(instance, '_loaded_group_id', instance.group_id)
+    old_image = '' if created else getattr(
+        instance, '_loaded_image', instance.image.name)
+    if created:
+        feed.fan_out(instance)
+        counters.bump_author(instance.author_id, 'posts_count', 1)
+        counters.bump_group(instance.group_id, 1)
+    elif old_group_id != instance.group_id:
+        counters.bump_group(old_group_id, -1)
+        counters.bump_group(instance.group_id, 1)
+    if old_image != instance.image.name:
+        images.acquire(instance.image.name)
+        images.release(old_image)
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance.author_id, instance.group_id, old_group_id))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+
+    counters.bump_author(instance.author_id, 'posts_count', -1)
+    counters.bump_group(instance.group_id, -1)
+    images.release(instance.image.name)
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance.author_id, instance.group_id))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Счётчики комментариев поста и автора, активность для тренда."""
+
+    if created and not raw:
+        counters.bump(
+            Post.objects.filter(pk=instance.post_id), 'comments_count', 1)
+        counters.bump_author(instance.author_id, 'comments_count', 1)
+        post = instance.post
+        feed_cache.bump(*feed_cache.post_scopes(
+            post.author_id, post.group_id))
+        trending.record(post.pk, post.group_id, 'comment')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+
+    counters.bump(
+        Post.objects.filter(pk=instance.post_id), 'comments_count', -1)
+    counters.bump_author(instance.author_id, 'comments_count', -1)
+    # При каскадном удалении поста его уже нет, кэш сбросит сам пост.
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'author_id', 'group_id').first()
+    if post is not None:
+        feed_cache.bump(*feed_cache.post_scopes(
+            post['author_id'], post['group_id']))
+
+
+def follow_scopes(follow):
+    """Профили, где видны кнопка подписки и счётчики подписок."""
+
+    return f'profile:{follow.author_id}', f'profile:{follow.user_id}'
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    """Лента подписчика, счётчики, граф подписок и отметка для подсказок."""
+
+    if created and not raw:
+        follow_graph.forget(instance.user_id)
+        recommendations.mark(instance.user_id, instance.author_id)
+        trending.record_follow(instance.author_id)
+        feed.backfill(instance)
+        counters.bump_author(instance.author_id, 'followers_count', 1)
+        counters.bump_author(instance.user_id, 'following_count', 1)
+        feed_cache.bump(*follow_scopes(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+
+    follow_graph.forget(instance.user_id)
+    recommendations.mark(instance.user_id, instance.author_id)
+    feed.trim(instance)
+    counters.bump_author(instance.author_id, 'followers_count', -1)
+    counters.bump_author(instance.user_id, 'following_count', -1)
+    feed_cache.bump(*follow_scopes(instance))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, created=False, raw=False, **kwargs):
+    """Слаг группы есть в ссылках всех лент."""
+
+    if not created and not raw:
+        feed_cache.bump(feed_cache.GLOBAL)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    """Имя автора есть во всех лентах; last_login при входе не в счёт."""
+
+    if created or raw:
+        return
+    if update_fields is None or USER_FEED_FIELDS & set(update_fields):
+        feed_cache.bump(feed_cache.GLOBAL)
+
+
+def search_triggers(sender, using, **kwargs):
+    """После migrate возвращает триггеры поиска, если SQLite их потерял."""
+
+    search.install_triggers(connections[using])
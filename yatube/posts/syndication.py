@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from . import feed_cache
+from .conditional import check
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+TITLE_WORDS = 8
+
+
+class LatestPostsFeed(Feed):
+    """RSS последних постов сайта."""
+
+    def title(self, obj):
+        return 'Yatube: последние обновления'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def description(self, obj):
+        return 'Новые посты всех авторов Yatube.'
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related('author')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(TITLE_WORDS)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    """RSS постов группы."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class ProfilePostsFeed(LatestPostsFeed):
+    """RSS постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Посты пользователя {obj.username}.'
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+def atom(feed_class):
+    """Та же лента в формате Atom."""
+
+    return type(f'Atom{feed_class.__name__}', (feed_class,), {
+        'feed_type': Atom1Feed,
+        'subtitle': feed_class.description,
+    })
+
+
+FEEDS = {
+    'index': LatestPostsFeed,
+    'group': GroupPostsFeed,
+    'profile': ProfilePostsFeed,
+}
+FORMATS = {
+    'rss': FEEDS,
+    'atom': {name: atom(feed_class) for name, feed_class in FEEDS.items()},
+}
+
+
+def respond(request, name, scope, fmt, **kwargs):
+    """Лента из кэша; строится заново, только когда сдвинулось поколение.
+
+    Тело одинаково для всех читателей, поэтому ключ — поколение ленты,
+    хост и формат, а 304 отдаётся по общему для всех ETag.
+    """
+
+    if fmt not in FORMATS:
+        raise Http404
+    check(request, scope, personal=False)
+    key = (
+        f'syndication:{scope}:{fmt}:{request.get_host()}:'
+        f'{feed_cache.generation(scope)}'
+    )
+    cached = cache.get(key)
+    if cached is None:
+        response = FORMATS[fmt][name]()(request, **kwargs)
+        cached = response.content, response['Content-Type']
+        if not feed_cache.replica_may_lag(scope):
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
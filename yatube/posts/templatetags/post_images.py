@@ -0,0 +1,40 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_sets(posts, field=None):
+    """Копии картинок всех постов страницы одним чтением.
+
+    Для строк с постом внутри (например, TrendingPost) field — имя поля
+    с постом. Недостающие копии ставятся в очередь.
+    """
+
+    if field:
+        posts = [getattr(row, field) for row in posts]
+    names = [post.image.name for post in posts if post.image]
+    found = thumbnails.get_image_sets(names)
+    for name, image_set in found.items():
+        if image_set is None:
+            thumbnails.schedule(name)
+    return found
+
+
+@register.simple_tag
+def post_image(image, image_sets=None):
+    """Готовые копии картинки или None; недостающие ставим в очередь.
+
+    Если страница загрузила копии тегом image_sets, берём оттуда.
+    """
+
+    if not image:
+        return None
+    if image_sets and image.name in image_sets:
+        return image_sets[image.name]
+    image_set = thumbnails.get_image_set(image.name)
+    if image_set is None:
+        thumbnails.schedule(image.name)
+    return image_set
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from posts import counters
+from posts.models import FeedItem, Follow, Post, User
+
+
+class BenchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        call_command(
+            'seed_bench', users=30, groups=3, posts=200, comments=100,
+            follows=5, stdout=StringIO(),
+        )
+
+    def test_seed_bench(self):
+        """Данные согласованы: счётчики и ленты как после сигналов."""
+
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(any(counters.rebuild(check=True).values()))
+        follow = Follow.objects.first()
+        self.assertEqual(
+            FeedItem.objects.filter(
+                user=follow.user, post__author=follow.author).count(),
+            follow.author.posts.count(),
+        )
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'day').count(), 1)
+
+        with self.assertRaises(CommandError):
+            call_command('seed_bench', users=30, stdout=StringIO())
+
+    def test_bench_report(self):
+        """Отчёт замера покрывает адреса posts, users, about и api."""
+
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        posts_count = Post.objects.count()
+
+        call_command(
+            'bench', requests=2, warmup=0, output=path, compare=path,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+        with open(path) as file:
+            report = json.load(file)
+        for name in ('posts:index', 'posts:post_detail', 'users:login',
+                     'about:tech', 'posts:profile_follow', 'api:posts',
+                     'posts:index_feed', 'posts:group_feed',
+                     'posts:profile_feed'):
+            with self.subTest(url=name):
+                self.assertIn(name, report['urls'])
+                self.assertIn('p99_ms', report['urls'][name])
+        self.assertEqual(report['urls']['posts:index']['status'], 200)
+        self.assertEqual(report['urls']['posts:index_feed']['status'], 200)
+        self.assertNotIn('posts:export', report['urls'])
+        self.assertGreater(report['urls']['posts:index']['queries'], 0)
+        self.assertEqual(report['meta']['rows']['post'], posts_count)
+        # Замер ничего не меняет в базе
+        self.assertEqual(Post.objects.count(), posts_count)
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import threading
+
+from core.cache import SQLiteCache
+from django.test import SimpleTestCase
+
+THREADS = 8
+INCREMENTS = 50
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.cache = self.connect()
+
+    def connect(self):
+        return SQLiteCache(os.path.join(self.dir, 'cache.sqlite3'), {})
+
+    def test_incr_is_atomic(self):
+        """Одновременные incr() из разных соединений не теряются."""
+
+        self.cache.set('gen', 0, None)
+
+        def work():
+            cache = self.connect()
+            for _ in range(INCREMENTS):
+                cache.incr('gen')
+
+        threads = [threading.Thread(target=work) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('gen'), THREADS * INCREMENTS)
+
+    def test_incr_missing(self):
+        """incr() несуществующего ключа — ValueError, как у memcached."""
+
+        with self.assertRaises(ValueError):
+            self.cache.incr('gen')
+
+    def test_add_and_expiry(self):
+        """add() не перезаписывает живой ключ, но занимает просроченный."""
+
+        self.assertTrue(self.cache.add('slot', 'первый'))
+        self.assertFalse(self.cache.add('slot', 'второй'))
+        self.assertEqual(self.cache.get('slot'), 'первый')
+        self.cache.set('slot', 'старый', -1)
+        self.assertIsNone(self.cache.get('slot'))
+        self.assertTrue(self.cache.add('slot', 'новый'))
+        self.assertEqual(self.cache.get('slot'), 'новый')
+
+    def test_get_many(self):
+        """get_many() отдаёт и числа, и объекты одним запросом."""
+
+        self.cache.set_many({'a': 1, 'b': {'ids': [1, 2]}}, None)
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']),
+            {'a': 1, 'b': {'ids': [1, 2]}},
+        )
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
@@ -0,0 +1,92 @@
+import datetime as dt
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.imports import explicit_dates
+from posts.models import Comment, Post, User
+from posts.views import COMMENTS_PER_PAGE
+
+
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.post = Post.objects.create(text='Вирусный пост', author=cls.user)
+        # Одинаковое время у части комментариев: порядок решает id
+        now = timezone.now()
+        with explicit_dates(Comment):
+            Comment.objects.bulk_create([
+                Comment(post=cls.post, author=cls.user,
+                        text=f'Комментарий {i}',
+                        created=now - dt.timedelta(seconds=i // 3))
+                for i in range(COMMENTS_PER_PAGE * 2 + 5)
+            ])
+        cls.expected = list(Comment.objects.filter(post=cls.post).order_by(
+            '-created', '-pk').values_list('text', flat=True))
+
+    def setUp(self):
+
+        cache.clear()
+        self.guest_client = Client()
+
+    def texts(self, comments):
+
+        return [comment.text for comment in comments]
+
+    def test_first_page_inline(self):
+        """На странице поста только первая страница и ссылка на следующую."""
+
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        comments = response.context['comments']
+        self.assertEqual(
+            self.texts(comments), self.expected[:COMMENTS_PER_PAGE])
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, 'data-comments-url')
+
+    def test_fragments(self):
+        """Фрагменты листают все комментарии без пропусков и повторов."""
+
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        seen = self.texts(response.context['comments'])
+        cursor = response.context['comments'].next_cursor
+        while cursor:
+            response = self.guest_client.get(
+                reverse('posts:post_comments', args=[self.post.id]),
+                {'after': cursor},
+            )
+            self.assertTemplateUsed(response, 'posts/comment_list.html')
+            self.assertNotContains(response, '<html')
+            seen += self.texts(response.context['comments'])
+            cursor = response.context['comments'].next_cursor
+        self.assertEqual(seen, self.expected)
+
+    def test_fragment_matches_api(self):
+        """Курсор фрагмента подходит и для JSON API."""
+
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        cursor = response.context['comments'].next_cursor
+        data = self.guest_client.get(
+            reverse('api:post_comments', args=[self.post.id]),
+            {'after': cursor, 'fields': 'text', 'limit': COMMENTS_PER_PAGE},
+        ).json()
+        self.assertEqual(
+            [row['text'] for row in data['results']],
+            self.expected[COMMENTS_PER_PAGE:COMMENTS_PER_PAGE * 2])
+
+    def test_count_in_header(self):
+        """Заголовок показывает счётчик комментариев поста."""
+
+        Post.objects.filter(pk=self.post.pk).update(
+            comments_count=len(self.expected))
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        self.assertContains(
+            response, f'Комментарии: {len(self.expected)}')
@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from posts.models import Post, Group, User, Comment, Follow, AuthorStats
+
+
+class CountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.reader = User.objects.create_user(username='Читатель')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_change = Group.objects.create(
+            title='Другая группа',
+            slug='test_slug_2',
+            description='Другое тестовое описание'
+        )
+
+    def stats(self, user):
+
+        return AuthorStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Счётчики постов меняются при создании, смене группы, удалении."""
+
+        post = Post.objects.create(
+            text='Много текста тестового поста',
+            author=CountersTests.user,
+            group=CountersTests.group,
+        )
+        self.assertEqual(self.stats(CountersTests.user).posts_count, 1)
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 1)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = CountersTests.group_change
+        post.save()
+        CountersTests.group.refresh_from_db()
+        CountersTests.group_change.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 0)
+        self.assertEqual(CountersTests.group_change.posts_count, 1)
+
+        post.delete()
+        self.assertEqual(self.stats(CountersTests.user).posts_count, 0)
+        CountersTests.group_change.refresh_from_db()
+        self.assertEqual(CountersTests.group_change.posts_count, 0)
+
+    def test_comment_and_follow_counters(self):
+        """Счётчики комментариев и подписок, каскадное удаление."""
+
+        post = Post.objects.create(
+            text='Много текста тестового поста',
+            author=CountersTests.user,
+        )
+        Comment.objects.create(
+            post=post, author=CountersTests.reader, text='Комментарий')
+        Follow.objects.create(
+            user=CountersTests.reader, author=CountersTests.user)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(CountersTests.reader).comments_count, 1)
+        self.assertEqual(self.stats(CountersTests.reader).following_count, 1)
+        self.assertEqual(self.stats(CountersTests.user).followers_count, 1)
+
+        # Cascade: the post takes its comment with it
+        post.delete()
+        self.assertEqual(self.stats(CountersTests.reader).comments_count, 0)
+        Follow.objects.all().delete()
+        self.assertEqual(self.stats(CountersTests.user).followers_count, 0)
+
+    def test_edit_does_not_overwrite_counter(self):
+        """Сохранение поста не затирает счётчик устаревшим значением."""
+
+        post = Post.objects.create(
+            text='Много текста тестового поста',
+            author=CountersTests.user,
+        )
+        stale = Post.objects.get(pk=post.pk)
+        Comment.objects.create(
+            post=post, author=CountersTests.reader, text='Комментарий')
+        stale.text = 'Изменённый текст'
+        stale.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_rebuild_counters_command(self):
+        """Команда находит и исправляет расхождения."""
+
+        Post.objects.create(
+            text='Много текста тестового поста',
+            author=CountersTests.user,
+            group=CountersTests.group,
+        )
+        Group.objects.update(posts_count=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', '--check', stdout=StringIO())
+
+        call_command('rebuild_counters', stdout=StringIO())
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 1)
+        call_command('rebuild_counters', '--check', stdout=StringIO())
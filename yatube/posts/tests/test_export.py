@@ -0,0 +1,125 @@
+import csv
+import datetime as dt
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Comment, Group, Post, User
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.other = User.objects.create_user(username='Пётр')
+        cls.staff = User.objects.create_user(
+            username='Сотрудник', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user,
+                group=cls.group if i % 2 else None)
+            for i in range(5)
+        ]
+        Post.objects.create(text='Чужой пост', author=cls.other)
+        Comment.objects.create(
+            post=cls.posts[1], author=cls.other, text='Комментарий')
+        # Старый пост для фильтра по датам
+        Post.objects.filter(pk=cls.posts[0].pk).update(
+            pub_date=timezone.now() - dt.timedelta(days=30))
+
+    def setUp(self):
+
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def export(self, kind='posts', **params):
+
+        response = self.staff_client.get(
+            reverse('posts:export', kwargs={'kind': kind}), params)
+        body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def test_staff_only(self):
+        """Гостя выгрузка отправляет на вход."""
+
+        response = self.guest_client.get(
+            reverse('posts:export', kwargs={'kind': 'posts'}))
+        self.assertEqual(response.status_code, 302)
+
+    def test_csv(self):
+        """CSV с заголовком, автором, группой и числом комментариев."""
+
+        response, body = self.export()
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 6)
+        row = next(r for r in rows if r['id'] == str(self.posts[1].pk))
+        self.assertEqual(row['author'], 'Василий')
+        self.assertEqual(row['group'], 'test-slug')
+        self.assertEqual(row['comments_count'], '1')
+
+    def test_jsonl_comments(self):
+        """Комментарии в JSON Lines."""
+
+        response, body = self.export('comments', format='jsonl')
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['post_id'], self.posts[1].pk)
+        self.assertEqual(lines[0]['author'], 'Пётр')
+
+    def test_filters(self):
+        """Фильтры по группе, автору и датам."""
+
+        today = timezone.now().date()
+        cases = {
+            'group': ({'group': 'test-slug'}, 2),
+            'author': ({'author': 'Пётр'}, 1),
+            'since': ({'since': today - dt.timedelta(days=1)}, 5),
+            'until': ({'until': today - dt.timedelta(days=1)}, 1),
+        }
+        for name, (params, expected) in cases.items():
+            with self.subTest(filter=name):
+                _, body = self.export(format='jsonl', **params)
+                self.assertEqual(len(body.splitlines()), expected)
+
+    def test_bad_request(self):
+        """Неизвестный формат — 400, неизвестная таблица — 404."""
+
+        for kind, params, status in (
+            ('posts', {'format': 'xml'}, 400),
+            ('users', {}, 404),
+        ):
+            with self.subTest(kind=kind):
+                response = self.staff_client.get(
+                    reverse('posts:export', kwargs={'kind': kind}), params)
+                self.assertEqual(response.status_code, status)
+
+    def test_command(self):
+        """Команда выгружает в файл мелкими пачками без потерь."""
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'posts.jsonl')
+        try:
+            call_command(
+                'export_posts', format='jsonl', output=path, chunk_size=2,
+                stderr=io.StringIO(),
+            )
+            with open(path) as file:
+                ids = [json.loads(line)['id'] for line in file]
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+        self.assertEqual(
+            ids, sorted(Post.objects.values_list('id', flat=True)))
@@ -0,0 +1,106 @@
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Post, User, Follow, FeedItem, FeedPullAuthor
+
+
+class FollowFeedTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username='Толстой')
+        cls.reader = User.objects.create_user(username='Читатель')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки',
+            author=cls.author,
+        )
+
+    def setUp(self):
+
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def get_feed(self):
+
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def plan(self, url):
+        """План запроса страницы ленты по курсору."""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = next(
+            query['sql'] for query in queries
+            if 'posts_feeditem' in query['sql'] and 'ORDER BY' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_cursor_uses_feed_index(self):
+        """Страница по курсору читает индекс ленты, без сортировки."""
+
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[FollowFeedTests.author]))
+        for _ in range(3):
+            Post.objects.create(text='Пост', author=FollowFeedTests.author)
+        response = self.authorized_client.get(
+            reverse('posts:follow_index') + '?after=')
+        cursor = response.context['page_obj'].paginator.encode_cursor(
+            response.context['page_obj'][1])
+        for url in (reverse('posts:follow_index'), reverse('api:follow')):
+            with self.subTest(url=url):
+                plan = self.plan(f'{url}?after={cursor}')
+                self.assertIn('feeditem_user_pub_date_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """Подписка заполняет ленту, отписка очищает её."""
+
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[FollowFeedTests.author]))
+        self.assertTrue(FeedItem.objects.filter(
+            user=FollowFeedTests.reader,
+            post=FollowFeedTests.old_post).exists())
+        self.assertEqual(self.get_feed(), [FollowFeedTests.old_post])
+
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=[FollowFeedTests.author]))
+        self.assertFalse(
+            FeedItem.objects.filter(user=FollowFeedTests.reader).exists())
+        self.assertEqual(self.get_feed(), [])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков."""
+
+        Follow.objects.create(
+            user=FollowFeedTests.reader, author=FollowFeedTests.author)
+        new_post = Post.objects.create(
+            text='Пост после подписки',
+            author=FollowFeedTests.author,
+        )
+        self.assertTrue(FeedItem.objects.filter(
+            user=FollowFeedTests.reader, post=new_post).exists())
+        self.assertEqual(
+            self.get_feed(), [new_post, FollowFeedTests.old_post])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_popular_author_is_pulled(self):
+        """Посты автора с большим числом подписчиков читаются напрямую."""
+
+        Follow.objects.create(
+            user=FollowFeedTests.reader, author=FollowFeedTests.author)
+        new_post = Post.objects.create(
+            text='Пост популярного автора',
+            author=FollowFeedTests.author,
+        )
+        self.assertTrue(FeedPullAuthor.objects.filter(
+            author=FollowFeedTests.author).exists())
+        self.assertFalse(FeedItem.objects.filter(post=new_post).exists())
+        self.assertEqual(
+            self.get_feed(), [new_post, FollowFeedTests.old_post])
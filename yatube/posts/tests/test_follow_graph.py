@@ -0,0 +1,74 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import follow_graph
+from posts.models import Follow, User
+
+
+class FollowGraphTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Читатель')
+        cls.author = User.objects.create_user(username='Василий')
+        cls.other = User.objects.create_user(username='Фёдор')
+        Follow.objects.create(user=cls.user, author=cls.other)
+
+    def setUp(self):
+
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_cached(self):
+        """Подписки читаются из базы один раз, дальше — из кэша."""
+
+        with self.assertNumQueries(1):
+            follow_graph.followees(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                follow_graph.followees(self.user.pk), {self.other.pk})
+            self.assertTrue(
+                follow_graph.is_following(self.user, self.other.pk))
+            self.assertFalse(
+                follow_graph.is_following(AnonymousUser(), self.other.pk))
+
+    def test_forget(self):
+        """Подписка и отписка сбрасывают кэш: одно чтение, дальше кэш."""
+
+        for url, following in (('posts:profile_follow', True),
+                               ('posts:profile_unfollow', False)):
+            with self.subTest(url=url):
+                follow_graph.followees(self.user.pk)
+                self.authorized_client.get(
+                    reverse(url, args=[self.author.username]))
+                with self.assertNumQueries(1):
+                    self.assertEqual(
+                        follow_graph.is_following(self.user, self.author.pk),
+                        following)
+                with self.assertNumQueries(0):
+                    follow_graph.followees(self.user.pk)
+
+    def test_invalidate(self):
+        """Подписки, записанные в обход сигналов, видны после сброса."""
+
+        follow_graph.followees(self.user.pk)
+        Follow.objects.bulk_create(
+            [Follow(user=self.user, author=self.author)])
+        follow_graph.invalidate()
+        self.assertTrue(follow_graph.is_following(self.user, self.author.pk))
+
+    def test_profile_button(self):
+        """Кнопка зависит от подписки текущего пользователя на автора."""
+
+        url = reverse('posts:profile', args=[self.other.username])
+        response = self.authorized_client.get(url)
+        self.assertTrue(response.context['following'])
+        # У автора есть подписчик, но сам Василий не подписан
+        response = self.author_client.get(url)
+        self.assertFalse(response.context['following'])
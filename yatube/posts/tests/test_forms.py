@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 from posts.models import Post, Group, User, Comment
@@ -11,7 +12,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
 class PostFormTests(TestCase):
 
     @classmethod
@@ -68,6 +69,8 @@ class PostFormTests(TestCase):
             content=small_gif,
             content_type='image/gif'
         )
+        # Файл называется по хешу содержимого
+        image_name = f'posts/{hashlib.sha256(small_gif).hexdigest()}.gif'
         form_data = {
             'text': 'Тестовый текст',
             'group': PostFormTests.group.id,
@@ -91,7 +94,7 @@ class PostFormTests(TestCase):
                         text=form_data['text'],
                         author=PostFormTests.user,
                         group=form_data['group'],
-                        image='posts/small.gif'
+                        image=image_name
                     ), response
                 )
         # Post_detail
@@ -104,7 +107,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=PostFormTests.user,
                 group=form_data['group'],
-                image='posts/small.gif'
+                image=image_name
             ), response
         )
         # Post exists in DATABASE
@@ -113,7 +116,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=PostFormTests.post.author,
                 group=form_data['group'],
-                image='posts/small.gif'
+                image=image_name
             ).exists()
         )
 
@@ -134,6 +137,7 @@ class PostFormTests(TestCase):
             content=big_gif,
             content_type='image/gif'
         )
+        image_name = f'posts/{hashlib.sha256(big_gif).hexdigest()}.gif'
         form_data = {
             'text': 'Измененный тестовый текст',
             'group': PostFormTests.group_change.id,
@@ -157,7 +161,7 @@ class PostFormTests(TestCase):
                         text=form_data['text'],
                         author=PostFormTests.user,
                         group=form_data['group'],
-                        image='posts/big.gif'
+                        image=image_name
                     ), response
                 )
         # Edited post on correct group_list
@@ -169,7 +173,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=PostFormTests.user,
                 group=form_data['group'],
-                image='posts/big.gif'
+                image=image_name
             ), response
         )
         # Post_detail
@@ -181,7 +185,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=PostFormTests.user,
                 group=form_data['group'],
-                image='posts/big.gif'
+                image=image_name
             ), response
         )
         # Post with initial group doesn't exist in DATABASE
@@ -190,7 +194,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=PostFormTests.post.author,
                 group=PostFormTests.group.id,
-                image='posts/big.gif'
+                image=image_name
             ).exists()
         )
 
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from posts import images, thumbnails
+from posts.models import ImageVariant, Post, StoredImage, User
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00')
+
+
+def upload(content, name='meme.GIF'):
+    return SimpleUploadedFile(name, content, content_type='image/gif')
+
+
+def refs(name):
+    return StoredImage.objects.get(name=name).refs
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedImageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, content):
+
+        return Post.objects.create(
+            text='Мем', author=self.user, image=upload(content))
+
+    def test_same_content_stored_once(self):
+        """Одинаковые картинки лежат в одном файле с именем-хешем."""
+
+        first = self.create_post(SMALL_GIF)
+        second = self.create_post(SMALL_GIF)
+        digest = hashlib.sha256(SMALL_GIF).hexdigest()
+        self.assertEqual(first.image.name, f'posts/{digest}.gif')
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(refs(first.image.name), 2)
+        files = os.listdir(os.path.dirname(first.image.path))
+        self.assertEqual(
+            [file for file in files if file.startswith(digest)],
+            [f'{digest}.gif'],
+        )
+
+    def test_replace_and_delete_release_file(self):
+        """Замена и удаление картинки отпускают ссылку, сирота удаляется."""
+
+        post = self.create_post(SMALL_GIF)
+        shared = self.create_post(SMALL_GIF)
+        old_name = post.image.name
+        thumbnails.generate(old_name)
+
+        post.image = upload(OTHER_GIF)
+        post.save()
+        self.assertEqual(refs(old_name), 1)
+        self.assertEqual(refs(post.image.name), 1)
+        self.assertFalse(images.collect(old_name))
+
+        shared.delete()
+        self.assertEqual(refs(old_name), 0)
+        self.assertTrue(images.collect(old_name))
+        self.assertFalse(post.image.storage.exists(old_name))
+        self.assertFalse(ImageVariant.objects.filter(source=old_name))
+        self.assertFalse(StoredImage.objects.filter(name=old_name))
+
+    def test_known_content_skips_thumbnail_work(self):
+        """Для уже виденного содержимого копии не пересоздаются."""
+
+        name = self.create_post(SMALL_GIF).image.name
+        self.assertTrue(thumbnails.generate(name))
+        self.create_post(SMALL_GIF)
+        with mock.patch.object(thumbnails.Image, 'open') as image_open:
+            self.assertTrue(thumbnails.generate(name))
+        image_open.assert_not_called()
+
+    def test_collect_images_command(self):
+        """Команда пересчитывает ссылки и удаляет файлы-сироты."""
+
+        post = self.create_post(SMALL_GIF)
+        orphan = Post.image.field.storage.save(
+            'posts/orphan.gif', ContentFile(OTHER_GIF))
+        StoredImage.objects.filter(name=post.image.name).update(refs=7)
+
+        out = StringIO()
+        call_command('collect_images', stdout=out)
+        self.assertIn(orphan, out.getvalue())
+        self.assertFalse(post.image.storage.exists(orphan))
+        self.assertTrue(post.image.storage.exists(post.image.name))
+        self.assertEqual(refs(post.image.name), 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ImageCollectTests(TransactionTestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username='Василий')
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_collect_on_commit(self):
+        """Файл удаляется после коммита, только если ссылок не осталось."""
+
+        post = Post.objects.create(
+            text='Мем', author=self.user, image=upload(SMALL_GIF))
+        name = post.image.name
+        with transaction.atomic():
+            post.delete()
+            # Та же картинка загружена снова до коммита удаления
+            images.acquire(name)
+        self.assertEqual(refs(name), 1)
+        self.assertTrue(post.image.storage.exists(name))
+
+        images.release(name)
+        self.assertFalse(StoredImage.objects.filter(name=name))
+        self.assertFalse(post.image.storage.exists(name))
@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from posts import imports, search
+from posts.management.commands import import_yatube
+from posts.models import (
+    Comment, FeedItem, Follow, Group, ImportCheckpoint, Post, User,
+)
+
+
+class ImportTests(TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, lines):
+
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as file:
+            file.write(lines)
+        return path
+
+    def write_jsonl(self, name, records):
+
+        return self.write(name, ''.join(
+            json.dumps(record, ensure_ascii=False) + '\n'
+            for record in records))
+
+    def import_yatube(self, **options):
+
+        out = StringIO()
+        call_command('import_yatube', stdout=out, **options)
+        return out.getvalue()
+
+    def test_round_trip(self):
+        """Выгрузка export_posts загружается обратно с теми же id."""
+
+        author = User.objects.create_user(username='Василий')
+        reader = User.objects.create_user(username='Читатель')
+        group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        post = Post.objects.create(
+            text='Уникальное слово', author=author, group=group)
+        Comment.objects.create(post=post, author=reader, text='Ого')
+        paths = {}
+        for kind, extra in (('posts', {}), ('comments', {'comments': True})):
+            paths[kind] = os.path.join(self.directory, f'{kind}.jsonl')
+            call_command(
+                'export_posts', format='jsonl', output=paths[kind],
+                stderr=StringIO(), **extra)
+        follows = self.write_jsonl('follows.jsonl', [
+            {'user': 'Читатель', 'author': 'Василий'},
+            {'user': 'Читатель', 'author': 'Василий'},
+            {'user': 'Василий', 'author': 'Василий'},
+        ])
+        Post.objects.all().delete()
+
+        output = self.import_yatube(
+            posts=paths['posts'], comments=paths['comments'],
+            follows=follows)
+
+        post = Post.objects.get(pk=post.pk)
+        self.assertEqual(post.text, 'Уникальное слово')
+        self.assertEqual(post.group, group)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertTrue(FeedItem.objects.filter(
+            user=reader, post=post).exists())
+        if search.available():
+            self.assertEqual(
+                [hit.post_id for hit in search.search('уникальное')],
+                [post.pk])
+        self.assertIn('строк/с', output)
+
+    def test_creates_authors_and_groups(self):
+        """Незнакомые авторы и группы создаются, CSV тоже читается."""
+
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\r\n'
+            'Пост,Новичок,new-group,2020-01-02T03:04:05\r\n'
+            'Ещё,Новичок,,\r\n',
+        )
+        output = self.import_yatube(posts=path)
+
+        author = User.objects.get(username='Новичок')
+        self.assertFalse(author.has_usable_password())
+        self.assertEqual(author.posts.count(), 2)
+        self.assertEqual(author.stats.posts_count, 2)
+        self.assertEqual(Group.objects.get(slug='new-group').posts_count, 1)
+        self.assertEqual(
+            Post.objects.get(text='Пост').pub_date.year, 2020)
+        self.assertIn('пользователей 1, групп 1', output)
+
+    def test_resume(self):
+        """После сбоя загрузка продолжается с незакоммиченной пачки."""
+
+        path = self.write_jsonl('posts.jsonl', [
+            {'text': f'Пост {i}', 'author': 'Василий'} for i in range(5)])
+        insert_posts = imports.Importer.insert_posts
+        calls = []
+
+        def crash_on_second(importer, batch):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise RuntimeError('сбой')
+            return insert_posts(importer, batch)
+
+        # Процесс убит: завершающий пересчёт не успел
+        with mock.patch.object(
+                imports.Importer, 'insert_posts', crash_on_second), \
+                mock.patch.object(import_yatube.Command, 'finish'):
+            with self.assertRaises(RuntimeError):
+                self.import_yatube(posts=path, batch_size=2)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().rows, 2)
+        if search.available():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'")
+                names = {name for name, in cursor.fetchall()}
+            self.assertLessEqual(set(search.TRIGGERS), names)
+
+        output = self.import_yatube(posts=path, batch_size=2)
+        self.assertIn('продолжено со строки 2', output)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            [f'Пост {i}' for i in range(5)])
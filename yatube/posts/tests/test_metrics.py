@@ -0,0 +1,94 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from core import metrics
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts.models import Post, User
+
+
+TEMP_METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR)
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.staff = User.objects.create_user(
+            username='Сотрудник', is_staff=True)
+        Post.objects.create(text='Пост', author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+
+        cache.clear()
+        metrics.reset()
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def server_timing(self, response):
+
+        return dict(
+            part.strip().split(';', 1)
+            for part in response['Server-Timing'].split(',')
+        )
+
+    def test_server_timing_header(self):
+        """Ответ несёт SQL, шаблоны, кэш и имя вида в Server-Timing."""
+
+        timing = self.server_timing(
+            self.guest_client.get(reverse('posts:index')))
+        self.assertEqual(set(timing), {'sql', 'tpl', 'cache', 'view', 'total'})
+        self.assertEqual(timing['view'], 'desc="posts:index"')
+        self.assertRegex(timing['sql'], r'dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('miss=', timing['cache'])
+
+        # Второй раз страница берётся из кэша фрагментов
+        timing = self.server_timing(
+            self.guest_client.get(reverse('posts:index')))
+        self.assertNotIn('hit=0 ', timing['cache'])
+
+    def test_staff_endpoint(self):
+        """Гистограммы видны только сотрудникам."""
+
+        for _ in range(3):
+            self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        report = self.staff_client.get(reverse('metrics')).json()
+        index = report['posts:index']
+        self.assertEqual(index['count'], 3)
+        self.assertEqual(sum(index['buckets'].values()), 3)
+        self.assertGreater(index['queries_avg'], 0)
+
+    def test_dump_metrics_command(self):
+        """Команда сводит гистограммы из файлов процессов."""
+
+        self.guest_client.get(reverse('posts:index'))
+        metrics.flush(force=True)
+        with open(metrics.dump_path(1), 'w') as file:
+            json.dump(metrics.snapshot(), file)
+
+        out = StringIO()
+        call_command('dump_metrics', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['posts:index']['count'], 2)
+
+        out = StringIO()
+        call_command('dump_metrics', '--reset', stdout=out)
+        self.assertIn('posts:index', out.getvalue())
+        self.assertEqual(metrics.report(), {})
@@ -1,6 +1,9 @@
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from posts.models import Post, Group, User
+from posts.paginators import CursorPaginator
 from posts.views import POSTS_PER_PAGE
 
 
@@ -47,3 +50,77 @@ class Paginator3000Test(TestCase):
                 response = self.guest_client.get(url + '?page=2')
                 self.assertEqual(
                     len(response.context.get('page_obj')), ADDITIONAL_PAGES)
+
+    def test_cursor_paginator(self):
+        """Курсорный режим листает все посты без пропусков и повторов."""
+
+        url = reverse('posts:index')
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+
+        response = self.guest_client.get(url + '?after=')
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), expected[:POSTS_PER_PAGE])
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+
+        response = self.guest_client.get(
+            url, {'after': page_obj.next_cursor})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), expected[POSTS_PER_PAGE:])
+        self.assertFalse(page_obj.has_next())
+
+        # Back to the newer page
+        response = self.guest_client.get(
+            url, {'before': page_obj.previous_cursor})
+        self.assertEqual(
+            list(response.context['page_obj']), expected[:POSTS_PER_PAGE])
+
+    def test_cursor_stable_on_new_posts(self):
+        """Новый пост не сдвигает следующую страницу курсора."""
+
+        url = reverse('posts:index')
+        response = self.guest_client.get(url + '?after=')
+        cursor = response.context['page_obj'].next_cursor
+        Post.objects.create(
+            text='Пост во время листания',
+            author=Paginator3000Test.user,
+        )
+        response = self.guest_client.get(url, {'after': cursor})
+        self.assertEqual(
+            len(response.context['page_obj']), ADDITIONAL_PAGES)
+
+    def test_cursor_without_count(self):
+        """Курсорная страница — один запрос, без COUNT."""
+
+        paginator = CursorPaginator(Post.objects.all(), POSTS_PER_PAGE)
+        with self.assertNumQueries(1):
+            page_obj = paginator.get_page(after='')
+            self.assertEqual(len(page_obj), POSTS_PER_PAGE)
+        # Broken cursor falls back to the first page
+        page_obj = paginator.get_page(after='oops')
+        self.assertEqual(len(page_obj), POSTS_PER_PAGE)
+
+    def test_cursor_uses_index(self):
+        """Страница по курсору — поиск по индексу, без временной сортировки."""
+
+        paginator = CursorPaginator(Post.objects.all(), POSTS_PER_PAGE)
+        cursor = paginator.get_page(after='').next_cursor
+        querysets = {
+            'post_pub_date_idx': Post.objects.all(),
+            'post_group_pub_date_idx': Post.objects.filter(
+                group=Paginator3000Test.group),
+            'post_author_pub_date_idx': Post.objects.filter(
+                author=Paginator3000Test.user),
+        }
+        for index, queryset in querysets.items():
+            for direction in ('after', 'before'):
+                with self.subTest(index=index, direction=direction):
+                    paginator = CursorPaginator(queryset, POSTS_PER_PAGE)
+                    with CaptureQueriesContext(connection) as queries:
+                        paginator.get_page(**{direction: cursor})
+                    with connection.cursor() as db:
+                        db.execute(
+                            f'EXPLAIN QUERY PLAN {queries[0]["sql"]}')
+                        plan = ' '.join(row[-1] for row in db.fetchall())
+                    self.assertIn(f'USING INDEX {index}', plan)
+                    self.assertNotIn('TEMP B-TREE', plan)
@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Post, Group, User, Comment, Follow
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+# Максимум запросов на страницу, не зависящий от числа постов
+QUERY_BUDGET = {
+    'posts:index': 4,
+    'posts:group_list': 5,
+    'posts:profile': 6,
+    'posts:post_detail': 4,
+    # Ещё одно чтение — подсказки «кого почитать»
+    'posts:follow_index': 6,
+}
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='Василий', first_name='Василий', last_name='Тёркин')
+        cls.reader = User.objects.create_user(username='Читатель')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def add_posts(self, n, image=False):
+
+        for i in range(n):
+            post = Post.objects.create(
+                text=f'Пост {i}',
+                author=QueryBudgetTests.user,
+                group=QueryBudgetTests.group,
+                # Разное содержимое — разные файлы картинок
+                image=SimpleUploadedFile(
+                    f'{i}.gif', SMALL_GIF + bytes([i]),
+                    content_type='image/gif',
+                ) if image else '',
+            )
+            Comment.objects.create(
+                post=post, author=QueryBudgetTests.reader, text='Ого')
+        return post
+
+    def count_queries(self, url):
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        return len(queries)
+
+    def test_query_budget(self):
+        """Число запросов страниц не растёт с числом постов."""
+
+        post = self.add_posts(2)
+        urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=[QueryBudgetTests.group.slug]),
+            'posts:profile': reverse(
+                'posts:profile', args=[QueryBudgetTests.user]),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=[post.id]),
+            'posts:follow_index': reverse('posts:follow_index'),
+        }
+        few = {name: self.count_queries(url) for name, url in urls.items()}
+
+        self.add_posts(8)
+        for i in range(5):
+            Comment.objects.create(
+                post=post, author=QueryBudgetTests.user, text=f'Ещё {i}')
+        for name, url in urls.items():
+            with self.subTest(view=name):
+                many = self.count_queries(url)
+                self.assertEqual(many, few[name])
+                self.assertLessEqual(many, QUERY_BUDGET[name])
+
+    def test_images_query_budget(self):
+        """Копии картинок страницы читаются одним запросом, не по посту."""
+
+        self.add_posts(2, image=True)
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[QueryBudgetTests.group.slug]),
+            reverse('posts:profile', args=[QueryBudgetTests.user]),
+            reverse('posts:follow_index'),
+        ]
+        few = {url: self.count_queries(url) for url in urls}
+
+        self.add_posts(8, image=True)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), few[url])
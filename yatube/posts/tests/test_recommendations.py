@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import recommendations
+from posts.models import Follow, Recommendation, RecommendationChange, User
+
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'author', 'other', 'fan', 'idle')
+        }
+        u = cls.users
+        for user, author in (
+            ('reader', 'friend'),
+            # Друг читает author и other: оба — друзья друзей
+            ('friend', 'author'),
+            ('friend', 'other'),
+            # fan тоже читает friend и ещё author: совместная подписка
+            ('fan', 'friend'),
+            ('fan', 'author'),
+        ):
+            Follow.objects.create(user=u[user], author=u[author])
+
+    def setUp(self):
+
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.users['reader'])
+
+    def suggested(self, name):
+
+        return list(Recommendation.objects.filter(
+            user=self.users[name]).order_by('rank').values_list(
+            'author__username', flat=True))
+
+    def test_scores(self):
+        """Друзья друзей и совместные подписки, без себя и уже читаемых."""
+
+        recommendations.refresh(full=True)
+        # author: друг (×2) и читатель friend — fan; other — только друг
+        self.assertEqual(self.suggested('reader'), ['author', 'other'])
+        self.assertEqual(
+            Recommendation.objects.get(
+                user=self.users['reader'], author=self.users['author']
+            ).score,
+            recommendations.FRIEND_WEIGHT + 1,
+        )
+        self.assertEqual(self.suggested('idle'), [])
+        self.assertFalse(RecommendationChange.objects.exists())
+
+    def test_incremental(self):
+        """Пересчитываются только окрестности изменившихся подписок."""
+
+        recommendations.refresh(full=True)
+        Follow.objects.create(
+            user=self.users['reader'], author=self.users['author'])
+        users, _ = recommendations.refresh()
+        # reader, author и их подписчики: friend, fan
+        self.assertEqual(users, 4)
+        self.assertEqual(self.suggested('reader'), ['other'])
+        self.assertEqual(recommendations.refresh(), (0, 0))
+
+    def test_page(self):
+        """Подсказки на странице подписок — одно чтение, без читаемых."""
+
+        recommendations.refresh(full=True)
+        Follow.objects.create(
+            user=self.users['reader'], author=self.users['other'])
+        with self.assertNumQueries(1):
+            authors = recommendations.for_user(self.users['reader'])
+            self.assertEqual(
+                [author.username for author in authors], ['author'])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'ого почитать')
+        self.assertEqual(response.context['recommended'], authors)
+
+    def test_command(self):
+        """Команда пересчитывает и пишет итог."""
+
+        out = StringIO()
+        call_command('recommend_authors', full=True, stdout=out)
+        self.assertIn('Пользователей: 6', out.getvalue())
+        self.assertEqual(self.suggested('reader'), ['author', 'other'])
+
+    def test_command_bumps_profile(self):
+        """Пересчёт в команде меняет ETag своей страницы во всех процессах."""
+
+        url = reverse('posts:profile', args=['reader'])
+        etag = self.client.get(url)['ETag']
+        # Поколения не в кэше процесса: у соседнего воркера он свой
+        cache.clear()
+        self.assertEqual(self.client.get(url)['ETag'], etag)
+        call_command('recommend_authors', stdout=StringIO())
+        cache.clear()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
@@ -0,0 +1,123 @@
+import time
+from unittest import mock
+
+from core import replicas
+from core.cache import shared
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts import feed_cache
+from posts.models import Post, User
+
+
+# Реплика — та же тестовая база: проверяем, куда роутер отправил чтение
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaRoutingTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.author = User.objects.create_user(username='Автор')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def replica_reads(self, url, method='get', **data):
+        """Сколько раз запрос читал с реплики."""
+
+        with mock.patch.object(
+                replicas, 'pick_replica', return_value='default') as pick:
+            getattr(self.authorized_client, method)(url, data)
+        return pick.call_count
+
+    def test_read_views_use_replica(self):
+        """Виды-читатели идут на реплику, остальные — на основную."""
+
+        for url in [
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.author]),
+            reverse('posts:post_detail', args=[self.post.id]),
+            reverse('posts:follow_index'),
+        ]:
+            with self.subTest(url=url):
+                self.assertGreater(self.replica_reads(url), 0)
+        self.assertEqual(self.replica_reads(reverse('posts:post_create')), 0)
+
+    def test_read_your_writes(self):
+        """После записи пользователь читает с основной базы до таймаута."""
+
+        index = reverse('posts:index')
+        self.replica_reads(
+            reverse('posts:add_comment', args=[self.post.id]),
+            method='post', text='Комментарий',
+        )
+        self.assertEqual(self.replica_reads(index), 0)
+
+        session = self.authorized_client.session
+        session[replicas.SESSION_KEY] = time.time() - 1
+        session.save()
+        self.assertGreater(self.replica_reads(index), 0)
+
+        # Подписка — GET, но пишет в базу: тоже прилипаем
+        self.replica_reads(reverse('posts:profile_follow', args=[self.author]))
+        self.assertEqual(self.replica_reads(index), 0)
+
+    def test_reads_do_not_pin(self):
+        """Выбор базы для записи и просмотры не прилепляют к основной."""
+
+        token = replicas.written.set(False)
+        try:
+            replicas.ReplicaRouter().db_for_write(Post)
+            self.assertFalse(replicas.written.get())
+        finally:
+            replicas.written.reset(token)
+        for url in [
+            reverse('posts:post_detail', args=[self.post.id]),
+            reverse('posts:index'),
+        ]:
+            with self.subTest(url=url):
+                self.assertGreater(self.replica_reads(url), 0)
+
+    def test_lagging_replica_not_cached(self):
+        """Свежую ленту с реплики не кэшируют и не дают ей ETag."""
+
+        cache.clear()
+        feed_cache.bump('index')
+        with mock.patch.object(
+                replicas, 'pick_replica', return_value='default'):
+            response = self.authorized_client.get(reverse('posts:index'))
+            self.assertFalse(response.has_header('ETag'))
+            self.assertEqual(response.context['feed_cache_timeout'], 0)
+
+            # Реплика гарантированно догнала запись
+            past = time.time() - settings.REPLICA_PIN_SECONDS - 2
+            shared().set_many({
+                feed_cache._changed_key(scope): past
+                for scope in (feed_cache.GLOBAL, 'index')
+            }, None)
+            response = self.authorized_client.get(reverse('posts:index'))
+            self.assertTrue(response.has_header('ETag'))
+            self.assertEqual(
+                response.context['feed_cache_timeout'],
+                settings.FEED_CACHE_TIMEOUT)
+
+    def test_router_rules(self):
+        """Сессии читаются с основной, миграции на реплики не идут."""
+
+        router = replicas.ReplicaRouter()
+        token = replicas.use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Session), 'default')
+            with override_settings(DATABASE_REPLICAS=['replica_0']):
+                self.assertEqual(router.db_for_read(Post), 'replica_0')
+                self.assertFalse(router.allow_migrate('replica_0', 'posts'))
+                self.assertTrue(router.allow_migrate('default', 'posts'))
+        finally:
+            replicas.use_replica.reset(token)
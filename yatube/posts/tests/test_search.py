@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Post, User, Comment
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.post = Post.objects.create(
+            text='Ёжик в тумане <script>',
+            author=cls.user,
+        )
+        cls.other_post = Post.objects.create(
+            text='Совсем про другое',
+            author=cls.user,
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.other_post,
+            author=cls.user,
+            text='А ёжики тут причём?',
+        )
+
+    def setUp(self):
+
+        self.guest_client = Client()
+
+    def search(self, query):
+
+        response = self.guest_client.get(reverse('posts:search'), {'q': query})
+        return response, list(response.context['page_obj'])
+
+    def test_search_posts_and_comments(self):
+        """Поиск находит посты и комментарии и подсвечивает совпадения."""
+
+        response, hits = self.search('ёжик')
+        found = {(hit.kind, hit.object_id) for hit in hits}
+        self.assertEqual(found, {
+            ('post', SearchTests.post.id),
+            ('comment', SearchTests.comment.id),
+        })
+        self.assertContains(response, '<mark>Ёжик</mark>')
+        self.assertContains(response, '&lt;script&gt;')
+        self.assertNotContains(response, '<script>')
+
+    def test_index_follows_changes(self):
+        """Правка и удаление поста сразу попадают в индекс."""
+
+        post = Post.objects.create(text='Старый текст', author=self.user)
+        post.text = 'Новая редакция'
+        post.save()
+        self.assertEqual(self.search('старый')[1], [])
+        self.assertEqual(len(self.search('редакция')[1]), 1)
+        post.delete()
+        self.assertEqual(self.search('редакция')[1], [])
+
+    def test_search_api(self):
+        """API поиска отдаёт ранжированные результаты в JSON."""
+
+        response = self.guest_client.get(
+            reverse('posts:search_api'), {'q': 'тумане'})
+        data = response.json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['post_id'], SearchTests.post.id)
+
+    def test_empty_and_odd_queries(self):
+        """Пустой запрос и спецсимволы FTS не роняют страницу."""
+
+        for query in ['', '"', 'AND OR (', '*']:
+            with self.subTest(query=query):
+                response, hits = self.search(query)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(hits, [])
+
+    def test_rebuild_search_command(self):
+        """Команда переиндексации восстанавливает индекс."""
+
+        out = StringIO()
+        call_command('rebuild_search', stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertEqual(len(self.search('причём')[1]), 1)
+
+    def test_admin_search(self):
+        """Поиск в админке идёт по тому же индексу."""
+
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        self.guest_client.force_login(admin)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'тумане'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [SearchTests.post])
@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from posts.models import Post, User
+
+
+class SqliteProfileTests(TestCase):
+
+    def pragma(self, name):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        """Прагмы из OPTIONS стоят на соединении."""
+
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -16 * 1024)
+
+
+class SqliteBenchTests(TransactionTestCase):
+
+    def test_bench_sqlite(self):
+        """Замер сравнивает стандартный и настроенный профили."""
+
+        user = User.objects.create_user(username='Василий')
+        for i in range(20):
+            Post.objects.create(text=f'Пост {i}', author=user)
+
+        out = StringIO()
+        call_command(
+            'bench_sqlite', threads=2, seconds=0.2, write_ratio=0.5,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['default', 'tuned'])
+        self.assertIn('ошибок 0', lines[1])
+        # Замер идёт на копиях базы
+        self.assertEqual(Post.objects.get(text='Пост 0').comments_count, 0)
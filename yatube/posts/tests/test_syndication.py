@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+
+class SyndicationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='Василий', first_name='Василий', last_name='Тёркин')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.post = Post.objects.create(
+            text='Пост в ленте', author=cls.user, group=cls.group)
+
+    def setUp(self):
+
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def urls(self, fmt):
+
+        return (
+            reverse('posts:index_feed', args=[fmt]),
+            reverse('posts:group_feed', args=[self.group.slug, fmt]),
+            reverse('posts:profile_feed', args=[self.user.username, fmt]),
+        )
+
+    def test_formats(self):
+        """RSS и Atom общей ленты, группы и автора."""
+
+        for fmt, content_type in (('rss', 'application/rss+xml'),
+                                  ('atom', 'application/atom+xml')):
+            for url in self.urls(fmt):
+                with self.subTest(url=url):
+                    response = self.guest_client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(
+                        response['Content-Type'].startswith(content_type))
+                    self.assertContains(response, 'Пост в ленте')
+                    self.assertContains(response, 'Василий Тёркин')
+
+    def test_cached(self):
+        """Повторный опрос не ходит в базу, пока лента не изменилась."""
+
+        url = reverse('posts:index_feed', args=['rss'])
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Пост в ленте')
+
+        Post.objects.create(text='Свежий пост', author=self.user)
+        self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_not_modified(self):
+        """ETag общий для всех читателей, ответ можно хранить в CDN."""
+
+        for url in self.urls('atom'):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response['Cache-Control'], 'no-cache')
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_missing(self):
+        """Неизвестный формат и несуществующая группа — 404."""
+
+        for url in (
+            reverse('posts:index_feed', args=['json']),
+            reverse('posts:group_feed', args=['nope', 'rss']),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
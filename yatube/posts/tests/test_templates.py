@@ -0,0 +1,77 @@
+import copy
+from io import StringIO
+
+from core import template_cache
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+from posts.models import Post, User
+
+
+def templates_settings(cached):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    loaders = settings.TEMPLATE_LOADERS
+    templates[0]['OPTIONS']['loaders'] = (
+        [('django.template.loaders.cached.Loader', loaders)]
+        if cached else loaders
+    )
+    return templates
+
+
+class TemplateCacheTests(TestCase):
+
+    def test_warm_up_fills_cache(self):
+        """При старте воркера в кэш попадают все шаблоны templates/."""
+
+        with override_settings(TEMPLATES=templates_settings(cached=True)):
+            engine = engines.all()[0]
+            self.assertTrue(template_cache.is_cached(engine))
+            template_cache.warm_up()
+            loader = engine.engine.template_loaders[0]
+            cached = set(loader.get_template_cache)
+        for name in ('posts/index.html', 'posts/post.html',
+                     'includes/switcher.html', 'includes/paginator.html',
+                     'includes/header.html', 'includes/footer.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, cached)
+
+    def test_warm_up_without_cache(self):
+        """Без кэширующего загрузчика прогрев ничего не делает."""
+
+        with override_settings(TEMPLATES=templates_settings(cached=False)):
+            engine = engines.all()[0]
+            self.assertFalse(template_cache.is_cached(engine))
+            with self.assertLogs('core.template_cache', 'INFO') as logs:
+                template_cache.logger.info('маркер')
+                template_cache.warm_up()
+        self.assertEqual(len(logs.output), 1)
+
+    def test_check_templates(self):
+        """Команда компилирует шаблоны и проверяет режим загрузчика."""
+
+        out = StringIO()
+        with override_settings(TEMPLATES=templates_settings(cached=True)):
+            call_command('check_templates', require_cache=True, stdout=out)
+        self.assertIn('кэширующий', out.getvalue())
+        self.assertIn('Шаблоны в порядке', out.getvalue())
+
+        with override_settings(TEMPLATES=templates_settings(cached=False)):
+            with self.assertRaises(CommandError):
+                call_command(
+                    'check_templates', require_cache=True, stdout=StringIO(),
+                    stderr=StringIO())
+
+    def test_bench_templates(self):
+        """Замер отрисовывает главную в обоих режимах загрузчика."""
+
+        user = User.objects.create_user(username='Василий')
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=user)
+
+        out = StringIO()
+        call_command('bench_templates', posts=2, renders=3, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines[:2]],
+                         ['plain', 'cached'])
+        self.assertIn('ускоряет', lines[2])
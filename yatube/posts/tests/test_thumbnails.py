@@ -0,0 +1,199 @@
+import shutil
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings)
+from django.urls import reverse
+from posts import thumbnails
+from posts.models import ImageVariant, Post, User
+from PIL import Image
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PLACEHOLDER = 'aspect-ratio: 960 / 339'
+
+
+def small_gif(name='small.gif'):
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_placeholder_until_ready(self):
+        """Пока миниатюры нет, вместо картинки стоит заглушка."""
+
+        post = Post.objects.create(
+            text='Пост с картинкой', author=self.user, image=small_gif())
+        urls = [
+            reverse('posts:post_detail', args=[post.id]),
+            # Ленты кэшируют фрагмент с заглушкой
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.user.username]),
+        ]
+
+        for url in urls:
+            response = self.authorized_client.get(url)
+            self.assertContains(response, PLACEHOLDER)
+            self.assertNotContains(response, '<picture>')
+
+        thumbnails.submit(post.image.name)
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertNotContains(response, PLACEHOLDER)
+                self.assertContains(response, '<picture>')
+                self.assertContains(response, thumbnails.get_image_set(
+                    post.image.name).webp)
+
+    def test_variants(self):
+        """Копии в WebP и JPEG не шире оригинала и учтены в базе."""
+
+        buffer = BytesIO()
+        Image.new('RGB', (1000, 500), 'red').save(buffer, 'PNG')
+        post = Post.objects.create(
+            text='Большая картинка', author=self.user,
+            image=SimpleUploadedFile('big.png', buffer.getvalue()),
+        )
+        self.assertTrue(thumbnails.generate(post.image.name))
+
+        variants = ImageVariant.objects.filter(source=post.image.name)
+        self.assertEqual(
+            sorted(variants.values_list('format', 'width', 'height')),
+            [('jpeg', 320, 113), ('jpeg', 640, 226), ('jpeg', 960, 339),
+             ('webp', 320, 113), ('webp', 640, 226), ('webp', 960, 339)],
+        )
+        image_set = thumbnails.get_image_set(post.image.name)
+        self.assertIn('640w', image_set.webp)
+        self.assertTrue(image_set.src.endswith('_960.jpeg'))
+        for variant in variants:
+            with Image.open(variant.file.path) as image:
+                self.assertEqual(image.format, variant.format.upper())
+
+        # Повторный запуск ничего не создаёт заново
+        self.assertTrue(thumbnails.generate(post.image.name))
+        self.assertEqual(variants.count(), 6)
+
+    def test_create_and_edit_schedule_thumbnail(self):
+        """Новая картинка уходит в очередь при создании и правке."""
+
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                {'text': 'Новый пост', 'image': small_gif('new.gif')},
+            )
+            post = Post.objects.latest('pk')
+            schedule.assert_called_once_with(post.image.name)
+
+            schedule.reset_mock()
+            self.authorized_client.post(
+                reverse('posts:post_edit', args=[post.id]),
+                {'text': 'Только текст'},
+            )
+            schedule.assert_not_called()
+
+    def test_missing_cached(self):
+        """Без копий база и очередь не трогаются на каждом показе."""
+
+        name = Post.objects.create(
+            text='Пост с картинкой', author=self.user, image=small_gif(),
+        ).image.name
+        with mock.patch.object(thumbnails.transaction, 'on_commit') as queue:
+            for _ in range(3):
+                self.assertIsNone(thumbnails.get_image_set(name))
+                thumbnails.schedule(name)
+            queue.assert_called_once()
+        with self.assertNumQueries(0):
+            self.assertIsNone(thumbnails.get_image_set(name))
+
+    def test_broken_image(self):
+        """Нечитаемая картинка не роняет генерацию и не встаёт в очередь."""
+
+        with self.assertLogs('posts.thumbnails', 'WARNING'):
+            self.assertFalse(thumbnails.generate('posts/missing.gif'))
+        name = Post.objects.create(
+            text='Не картинка', author=self.user,
+            image=SimpleUploadedFile('fake.gif', b'not a gif'),
+        ).image.name
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            self.assertFalse(thumbnails.generate(name))
+        with mock.patch.object(thumbnails.transaction, 'on_commit') as queue:
+            thumbnails.schedule(name)
+            queue.assert_not_called()
+
+    def test_submit_once(self):
+        """Картинку, которую уже делает поток, другой поток не берёт."""
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow_generate(name):
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(
+                thumbnails, 'generate', side_effect=slow_generate) as gen:
+            worker = threading.Thread(
+                target=thumbnails.submit, args=['posts/a.gif'])
+            worker.start()
+            started.wait(5)
+            thumbnails.submit('posts/a.gif')
+            release.set()
+            worker.join()
+            thumbnails.submit('posts/a.gif')
+        self.assertEqual(gen.call_count, 2)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PregenerateCommandTests(TransactionTestCase):
+
+    def tearDown(self):
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_pregenerate_thumbnails(self):
+        """Команда создаёт миниатюры всех картинок постов."""
+
+        cache.clear()
+        user = User.objects.create_user(username='Василий')
+        post = Post.objects.create(
+            text='Пост', author=user, image=small_gif('old.gif'))
+        Post.objects.create(text='Без картинки', author=user)
+
+        out = StringIO()
+        call_command('pregenerate_thumbnails', workers=1, stdout=out)
+        self.assertIn('Картинок готово: 1', out.getvalue())
+        self.assertIsNotNone(thumbnails.get_image_set(post.image.name))
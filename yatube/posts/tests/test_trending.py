@@ -0,0 +1,136 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from core.cache import shared
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import feed_cache, trending
+from posts.models import (
+    Comment, Follow, Group, Post, TrendingGroup, TrendingPost, User,
+)
+
+
+def later():
+    """Момент, когда текущая корзина уже закончилась."""
+
+    return time.time() + settings.TRENDING_BUCKET_SECONDS
+
+
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='Василий')
+        cls.reader = User.objects.create_user(username='Читатель')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.hot = Post.objects.create(
+            text='Горячий пост', author=cls.user, group=cls.group)
+        cls.calm = Post.objects.create(text='Тихий пост', author=cls.reader)
+
+    def setUp(self):
+
+        cache.clear()
+        shared().clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def score(self, post):
+
+        return TrendingPost.objects.get(post=post).score
+
+    def test_events(self):
+        """Просмотры, комментарии и подписки копятся в корзинах кэша."""
+
+        self.guest_client.get(
+            reverse('posts:post_detail', args=[self.calm.pk]))
+        Comment.objects.create(
+            post=self.hot, author=self.reader, text='Ого')
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(trending.fold(later()), 2)
+        self.assertEqual(
+            self.score(self.hot),
+            trending.WEIGHTS['comment'] + trending.WEIGHTS['follow'])
+        self.assertEqual(self.score(self.calm), trending.WEIGHTS['view'])
+        self.assertEqual(
+            TrendingGroup.objects.get(group=self.group).score,
+            self.score(self.hot))
+
+    def test_fold_once(self):
+        """Текущая корзина ждёт, свёрнутая второй раз не считается."""
+
+        trending.record(self.hot.pk, None, 'view')
+        self.assertEqual(trending.fold(), 0)
+        moment = later()
+        self.assertEqual(trending.fold(moment), 1)
+        self.assertEqual(trending.fold(moment), 0)
+        self.assertEqual(self.score(self.hot), trending.WEIGHTS['view'])
+
+    def test_decay(self):
+        """Счёт вдвое падает за период полураспада, малый — удаляется."""
+
+        for _ in range(4):
+            trending.record(self.hot.pk, None, 'view')
+        trending.record(self.calm.pk, None, 'view')
+        moment = later()
+        trending.fold(moment)
+        trending.fold(moment + 2 * settings.TRENDING_HALF_LIFE)
+        self.assertAlmostEqual(self.score(self.hot), 1)
+        self.assertFalse(
+            TrendingPost.objects.filter(post=self.calm).exists())
+
+    def test_page(self):
+        """Вкладка — одно чтение постов по счёту, без агрегатов."""
+
+        for _ in range(3):
+            trending.record(self.calm.pk, None, 'view')
+        trending.record(self.hot.pk, self.group.pk, 'view')
+        trending.fold(later())
+
+        url = reverse('posts:trending')
+        response = self.authorized_client.get(url)
+        self.assertEqual(
+            [row.post for row in response.context['top_posts']],
+            [self.calm, self.hot])
+        self.assertContains(response, f'href="{url}"')
+        self.assertContains(response, self.group.title)
+        # Сессия, пользователь, посты и группы
+        cache.clear()
+        with self.assertNumQueries(4):
+            self.authorized_client.get(url)
+
+    def test_post_changes(self):
+        """Правка и удаление поста сбрасывают кэш страницы."""
+
+        for change in (self.calm.save, self.calm.delete):
+            with self.subTest(change=change.__name__):
+                before = feed_cache.generation(trending.SCOPE)
+                change()
+                self.assertNotEqual(
+                    feed_cache.generation(trending.SCOPE), before)
+
+    def test_command(self):
+        """Команда сворачивает корзины, записанные другими процессами."""
+
+        current = trending.bucket()
+        # Прошлая корзина закончилась, позапрошлая вне окна
+        with mock.patch.object(trending, 'bucket', return_value=current - 1):
+            trending.record(self.hot.pk, self.group.pk, 'comment')
+        outside = current - settings.TRENDING_BUCKETS - 1
+        with mock.patch.object(trending, 'bucket', return_value=outside):
+            trending.record(self.calm.pk, None, 'view')
+        # Кэш процесса тут ни при чём: корзины лежат в общем кэше
+        cache.clear()
+
+        out = StringIO()
+        call_command('fold_trending', stdout=out)
+        self.assertIn('Свёрнуто постов: 1', out.getvalue())
+        self.assertEqual(self.score(self.hot), trending.WEIGHTS['comment'])
+        self.assertEqual(trending.fold(), 0)
@@ -1,9 +1,10 @@
-from django.test import TestCase, Client
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from django import forms
 from posts.models import Post, Group, User, Follow
 from django.core.cache import cache
-import time
 
 
 class PostPagesTests(TestCase):
@@ -52,23 +53,47 @@ class PostPagesTests(TestCase):
             len(response.context['page_obj']), 2)
 
     def test_index_cache(self):
-        """Посты index кэшируются на 20 секунд."""
+        """Посты index кэшируются до первого изменения."""
 
         response = self.guest_client.get(reverse('posts:index'))
         page_0 = response.content
+        # Change bypassing signals: cached content didn't change
+        Post.objects.filter(pk=self.post_2.pk).update(text='Тихая правка')
+        response_1 = self.guest_client.get(reverse('posts:index'))
+        page_1 = response_1.content
+        self.assertEqual(page_0, page_1)
+        # New post invalidates the cache right away
         Post.objects.create(
             text='Новый умный пост',
             author=PostPagesTests.user,
         )
-        # Content didn't change
-        response_2 = self.guest_client.get(reverse('posts:index'))
-        page_1 = response_2.content
-        self.assertEqual(page_0, page_1)
-        # Content changed after 20 seconds
-        time.sleep(20)
         response_2 = self.guest_client.get(reverse('posts:index'))
         page_2 = response_2.content
         self.assertNotEqual(page_0, page_2)
+        self.assertContains(response_2, 'Новый умный пост')
+
+    def test_feed_cache_invalidation(self):
+        """Правка и удаление поста сразу видны в group_list и profile."""
+
+        urls = [
+            reverse('posts:group_list', args=[PostPagesTests.group.slug]),
+            reverse('posts:profile', args=[PostPagesTests.user]),
+        ]
+        for url in urls:
+            self.guest_client.get(url)
+
+        self.post_2.text = 'Отредактированный текст'
+        self.post_2.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Отредактированный текст')
+
+        self.post_2.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotContains(response, 'Отредактированный текст')
 
     def test_group_list_context(self):
         """Шаблон group_list использует правильный контекст."""
@@ -230,3 +255,24 @@ class PostPagesTests(TestCase):
         not_expected = Post.objects.exclude(group=self.post_2.group)
         self.assertNotIn(
             not_expected, response.context['page_obj'].object_list)
+
+
+class FeedCacheCommitTests(TransactionTestCase):
+
+    def test_render_before_commit(self):
+        """Лента, отрисованная до коммита правки, не переживает коммит."""
+
+        user = User.objects.create_user(username='Автор')
+        post = Post.objects.create(text='Старый текст', author=user)
+        client = Client()
+        url = reverse('posts:index')
+        client.get(url)
+        with transaction.atomic():
+            # Сигнал правки уже сдвинул поколение, а соседний запрос
+            # ещё видит старую строку и кэширует её
+            post_save.send(sender=Post, instance=post, created=False)
+            response = client.get(url)
+            self.assertContains(response, 'Старый текст')
+            Post.objects.filter(pk=post.pk).update(text='Новый текст')
+        response = client.get(url)
+        self.assertContains(response, 'Новый текст')
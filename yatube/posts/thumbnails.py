@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from . import feed_cache
+from .models import ImageVariant, Post
+
+logger = logging.getLogger(__name__)
+
+# Ширины копий для srcset; пропорции карточки поста в posts/post.html
+WIDTHS = (320, 640, 960, 1920)
+ASPECT = (960, 339)
+QUALITY = 80
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+SIZES = '(min-width: 1000px) 960px, 100vw'
+# Копий нет: база проверяется и картинка ставится в очередь не чаще
+# раза в MISSING_TIMEOUT секунд; нечитаемая — раза в FAILED_TIMEOUT
+MISSING_TIMEOUT = 60
+FAILED_TIMEOUT = 60 * 60 * 24
+MISSING = 'missing'
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = set()
+
+
+class ImageSet:
+    """Готовые копии одной картинки, собранные для <picture>."""
+
+    sizes = SIZES
+
+    def __init__(self, variants):
+        by_format = {}
+        for variant in sorted(variants, key=lambda v: v.width):
+            by_format.setdefault(variant.format, []).append(variant)
+        self.webp = self.srcset(by_format.get('webp', []))
+        self.jpeg = self.srcset(by_format.get('jpeg', []))
+        fallback = min(
+            by_format['jpeg'], key=lambda v: abs(v.width - ASPECT[0]))
+        self.src = fallback.file.url
+        self.width = fallback.width
+        self.height = fallback.height
+
+    @staticmethod
+    def srcset(variants):
+        return ', '.join(f'{v.file.url} {v.width}w' for v in variants)
+
+
+def cache_key(name):
+    return f'image_variants:{name}'
+
+
+def queued_key(name):
+    return f'image_queued:{name}'
+
+
+def widths_for(source_width):
+    """Ширины копий: не больше оригинала, но хотя бы одна."""
+
+    widths = [width for width in WIDTHS if width <= source_width]
+    return widths or WIDTHS[:1]
+
+
+def get_image_set(name):
+    """Копии картинки для srcset или None, если их ещё нет."""
+
+    if not name:
+        return None
+    return get_image_sets([name])[name]
+
+
+def get_image_sets(names):
+    """Копии нескольких картинок: одно чтение кэша и одно — базы.
+
+    Картинки без копий попадают в словарь со значением None. Отсутствие
+    копий тоже кэшируется, ненадолго: generate() сбросит ключ, как
+    только копии появятся.
+    """
+
+    keys = {cache_key(name): name for name in names if name}
+    image_sets = {
+        keys[key]: image_set
+        for key, image_set in cache.get_many(keys).items()
+    }
+    missing = set(keys.values()) - image_sets.keys()
+    if missing:
+        variants = {}
+        for variant in ImageVariant.objects.filter(source__in=missing):
+            variants.setdefault(variant.source, []).append(variant)
+        ready = {}
+        for name in missing:
+            found = variants.get(name, [])
+            if any(v.format == 'jpeg' for v in found):
+                ready[name] = ImageSet(found)
+            image_sets[name] = ready.get(name, MISSING)
+        cache.set_many(
+            {cache_key(name): ready[name] for name in ready}, None)
+        cache.set_many(
+            {cache_key(name): MISSING for name in missing - ready.keys()},
+            MISSING_TIMEOUT,
+        )
+    return {
+        name: None if image_set == MISSING else image_set
+        for name, image_set in image_sets.items()
+    }
+
+
+def generate(name):
+    """Создаёт копии картинки; False, если картинку не прочитать.
+
+    Копии привязаны к хешу содержимого, поэтому повторная загрузка
+    той же картинки обходится без декодирования.
+    """
+
+    try:
+        missing = not default_storage.exists(name)
+    except SuspiciousFileOperation:
+        missing = True
+    if missing:
+        logger.warning('Картинки %s нет в хранилище', name)
+        return give_up(name)
+    if ImageVariant.objects.filter(source=name).exists():
+        return True
+    try:
+        with default_storage.open(name) as file:
+            image = Image.open(file)
+            image.load()
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    except Exception:
+        logger.exception('Не удалось прочитать картинку %s', name)
+        return give_up(name)
+
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = []
+    for width in widths_for(image.width):
+        height = round(width * ASPECT[1] / ASPECT[0])
+        resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        for fmt, pil_format in PIL_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=QUALITY)
+            variant = ImageVariant(
+                source=name, width=width, height=height, format=fmt)
+            variant.file.save(
+                f'{stem}_{width}.{fmt}', ContentFile(buffer.getvalue()),
+                save=False,
+            )
+            variants.append(variant)
+    ImageVariant.objects.bulk_create(variants, ignore_conflicts=True)
+    cache.delete(cache_key(name))
+    bump_feeds(name)
+    return True
+
+
+def give_up(name):
+    """Нечитаемая картинка не встаёт в очередь на каждом показе."""
+
+    cache.set(queued_key(name), True, FAILED_TIMEOUT)
+    return False
+
+
+def bump_feeds(name):
+    """Сбрасывает ленты с постами картинки: в них кэширована заглушка."""
+
+    scopes = set()
+    for author_id, group_id in Post.objects.filter(
+            image=name).values_list('author_id', 'group_id'):
+        scopes.update(feed_cache.post_scopes(author_id, group_id))
+    feed_cache.bump(*scopes)
+
+
+def generate_in_thread(name):
+    """generate() для потока пула: закрывает свои соединения с БД."""
+
+    try:
+        return generate(name)
+    finally:
+        with _executor_lock:
+            _in_flight.discard(name)
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def submit(name):
+    """Ставит картинку в очередь пула, не дублируя уже стоящие."""
+
+    # Проверка и добавление под одним замком: запросы идут из потоков
+    with _executor_lock:
+        if name in _in_flight:
+            return
+        _in_flight.add(name)
+    if settings.THUMBNAIL_WORKERS:
+        get_executor().submit(generate_in_thread, name)
+        return
+    try:
+        generate(name)
+    finally:
+        with _executor_lock:
+            _in_flight.discard(name)
+
+
+def schedule(name):
+    """Создать копии после коммита, не задерживая ответ.
+
+    Повторно картинка встаёт в очередь только по истечении
+    MISSING_TIMEOUT или FAILED_TIMEOUT.
+    """
+
+    if name and cache.add(queued_key(name), True, MISSING_TIMEOUT):
+        transaction.on_commit(lambda: submit(name))
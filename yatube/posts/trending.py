@@ -0,0 +1,171 @@
+import datetime as dt
+import time
+from collections import Counter
+
+from core.cache import shared
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+
+from . import feed_cache
+from .models import Group, Post, TrendingGroup, TrendingPost
+
+# Вес события в счёте поста и его группы
+WEIGHTS = {
+    'view': 1,
+    'follow': 3,
+    'comment': 5,
+}
+# Сколько постов и групп на вкладке
+TOP_POSTS = 20
+TOP_GROUPS = 5
+# Строки с меньшим счётом удаляются, таблица не растёт
+MIN_SCORE = 0.5
+# Поколение страницы «В тренде»: сдвигают fold() и правки постов
+SCOPE = feed_cache.TRENDING
+
+
+def _timeout():
+    # Корзина живёт два окна: несвёрнутая старая сама уходит из кэша
+    return 2 * settings.TRENDING_BUCKETS * settings.TRENDING_BUCKET_SECONDS
+
+
+def _count_key(number):
+    return f'trending:{number}:n'
+
+
+def _slot_key(number, slot):
+    return f'trending:{number}:slot:{slot}'
+
+
+def _post_key(number, post_id):
+    return f'trending:{number}:post:{post_id}'
+
+
+def bucket(now=None):
+    """Номер корзины для момента now, unix-секунды."""
+
+    now = time.time() if now is None else now
+    return int(now // settings.TRENDING_BUCKET_SECONDS)
+
+
+def record(post_id, group_id, kind):
+    """Добавляет событие в текущую корзину общего кэша; база не трогается.
+
+    Счётчик поста растёт через incr. Первое событие поста в корзине
+    занимает слот — по слотам fold() находит, какие посты читать.
+    """
+
+    number = bucket()
+    key = _post_key(number, post_id)
+    weight = WEIGHTS[kind]
+    try:
+        shared().incr(key, weight)
+        return
+    except ValueError:
+        pass
+    if not shared().add(key, weight, _timeout()):
+        # Соседний запрос успел первым
+        shared().incr(key, weight)
+        return
+    shared().add(_count_key(number), 0, _timeout())
+    slot = shared().incr(_count_key(number))
+    shared().set(_slot_key(number, slot), (post_id, group_id), _timeout())
+
+
+def record_follow(author_id):
+    """Подписка на автора — событие его последнего поста."""
+
+    post = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'group_id').first()
+    if post is not None:
+        record(*post, 'follow')
+
+
+def drain(number):
+    """События корзины и её ключи, которые fold() удалит после записи.
+
+    Ключи не удаляются здесь: сбой свёртки оставляет корзину в кэше
+    до следующего запуска.
+    """
+
+    n = shared().get(_count_key(number))
+    if not n:
+        return {}, []
+    slot_keys = [_slot_key(number, slot) for slot in range(1, n + 1)]
+    slots = shared().get_many(slot_keys)
+    post_keys = {
+        _post_key(number, post_id): (post_id, group_id)
+        for post_id, group_id in slots.values()
+    }
+    counts = shared().get_many(post_keys)
+    events = {post_keys[key]: count for key, count in counts.items()}
+    return events, [_count_key(number), *slot_keys, *post_keys]
+
+
+def _fold_into(model, added, now):
+    """Затухание всех строк model и добавка свежих счётов."""
+
+    last = model.objects.aggregate(last=Max('updated'))['last']
+    if last is not None:
+        factor = 0.5 ** (
+            (now - last).total_seconds() / settings.TRENDING_HALF_LIFE)
+        model.objects.update(score=F('score') * factor, updated=now)
+    rows = model.objects.in_bulk(added)
+    for pk, row in rows.items():
+        row.score += added[pk]
+    model.objects.bulk_update(rows.values(), ['score'])
+    model.objects.bulk_create([
+        model(pk=pk, score=score, updated=now)
+        for pk, score in added.items() if pk not in rows
+    ])
+    model.objects.filter(score__lt=MIN_SCORE).delete()
+
+
+def fold(now=None):
+    """Сворачивает законченные корзины окна в таблицы счёта.
+
+    Текущая корзина ещё пополняется и ждёт следующего запуска.
+    Возвращает число свёрнутых постов.
+    """
+
+    now = time.time() if now is None else now
+    moment = dt.datetime.fromtimestamp(now, tz=dt.timezone.utc)
+    posts, groups = Counter(), Counter()
+    current = bucket(now)
+    drained = []
+    with transaction.atomic():
+        for number in range(current - settings.TRENDING_BUCKETS, current):
+            events, keys = drain(number)
+            drained += keys
+            for (post_id, group_id), count in events.items():
+                posts[post_id] += count
+                if group_id is not None:
+                    groups[group_id] += count
+        # Удалённые посты и группы уже не в тренде
+        posts = {
+            pk: posts[pk] for pk in
+            Post.objects.filter(pk__in=posts).values_list('pk', flat=True)
+        }
+        groups = {
+            pk: groups[pk] for pk in
+            Group.objects.filter(pk__in=groups).values_list('pk', flat=True)
+        }
+        _fold_into(TrendingPost, posts, moment)
+        _fold_into(TrendingGroup, groups, moment)
+    # Счёт записан: корзины больше не нужны, повтор их не найдёт
+    shared().delete_many(drained)
+    feed_cache.bump(SCOPE)
+    return len(posts)
+
+
+def top_posts():
+    """Строки счёта постов сверху вниз: одно чтение по индексу score."""
+
+    return TrendingPost.objects.select_related(
+        'post__author', 'post__group').order_by('-score')[:TOP_POSTS]
+
+
+def top_groups():
+    return TrendingGroup.objects.select_related('group').order_by(
+        '-score')[:TOP_GROUPS]
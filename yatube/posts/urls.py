@@ -14,14 +14,30 @@ urlpatterns = [
          name='post_detail'),
     path('create/', views.post_create,
          name='post_create'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/edit/', views.post_edit,
          name='post_edit'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('trending/', views.trending_posts,
+         name='trending'),
     path('follow/', views.follow_index,
          name='follow_index'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('profile/<str:username>/unfollow/', views.profile_unfollow,
          name='profile_unfollow'),
+    path('search/', views.post_search,
+         name='search'),
+    path('search/api/', views.post_search_api,
+         name='search_api'),
+    path('feeds/<str:fmt>/', views.index_feed,
+         name='index_feed'),
+    path('group/<slug:slug>/feeds/<str:fmt>/', views.group_feed,
+         name='group_feed'),
+    path('profile/<str:username>/feeds/<str:fmt>/', views.profile_feed,
+         name='profile_feed'),
+    path('export/<str:kind>/', views.export,
+         name='export'),
 ]
@@ -1,16 +1,43 @@
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from .models import Post, Group, User, Follow
-from .forms import PostForm, CommentForm
+from django.db import router, transaction
+from django.http import (
+    Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse,
+)
+from django.utils.http import urlencode
+from core.replicas import read_from_replica
+from .models import Post, Group, User
+from .forms import PostForm, CommentForm, ExportForm
+from .paginators import CursorPaginator
+from .feed import CURSOR_FIELD, CURSOR_TIEBREAK, follow_feed
+from .counters import get_author_stats
+from .conditional import check, conditional_get
+from . import (
+    exports, feed_cache, follow_graph, recommendations, search, syndication,
+    thumbnails, trending,
+)
 from django.shortcuts import redirect
-# from django.views.decorators.cache import cache_page
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
 
 
-def paginator_3000(post_list, request):
-    """Паджинатор."""
+def paginator_3000(post_list, request, **cursor):
+    """Паджинатор.
+
+    Если в запросе есть курсор (`?after=` или `?before=`), страница
+    строится по ключу (pub_date, id) без COUNT и OFFSET; другой ключ
+    задают field и tiebreak в cursor.
+    """
+
+    if 'after' in request.GET or 'before' in request.GET:
+        paginator = CursorPaginator(post_list, POSTS_PER_PAGE, **cursor)
+        return paginator.get_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
 
     paginator = Paginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
@@ -19,70 +46,126 @@ def paginator_3000(post_list, request):
     return page_obj
 
 
-# @cache_page(20, key_prefix="index_page")
+def comments_page(post, request):
+    """Комментарии по курсору (created, id), от новых к старым."""
+
+    paginator = CursorPaginator(
+        post.comments.select_related('author'), COMMENTS_PER_PAGE,
+        field='created',
+    )
+    return paginator.get_page(after=request.GET.get('after'))
+
+
+@read_from_replica
+@conditional_get
 def index(request):
     """Главная страница."""
 
+    check(request, 'index')
     template = 'posts/index.html'
     headline = 'Последние обновления на сайте'
 
-    post_list = Post.objects.all()
+    post_list = Post.objects.select_related('author', 'group')
 
     context = {
         'headline': headline,
         'page_obj': paginator_3000(post_list, request),
+        **feed_cache.context('index'),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional_get
+def trending_posts(request):
+    """Вкладка «В тренде»: посты и группы по затухающему счёту."""
+
+    check(request, trending.SCOPE)
+    template = 'posts/trending.html'
+    headline = 'В тренде'
+
+    context = {
+        'headline': headline,
+        'trending': True,
+        'top_posts': trending.top_posts(),
+        'top_groups': trending.top_groups(),
+        **feed_cache.context(trending.SCOPE),
+    }
+    return render(request, template, context)
+
+
+@read_from_replica
+@conditional_get
 def group_posts(request, slug):
     """Страница постов, отфильтрованных по группам."""
 
     group = get_object_or_404(Group, slug=slug)
+    check(request, f'group:{group.pk}')
     template = 'posts/group_list.html'
     headline = 'Записи сообщества: '
 
-    post_list = group.posts.all()
+    post_list = group.posts.select_related('author', 'group')
 
     context = {
         'headline': headline,
         'group': group,
         'page_obj': paginator_3000(post_list, request),
+        **feed_cache.context(f'group:{group.pk}'),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional_get
 def profile(request, username):
     """Страница пользователя/автора."""
 
-    username = get_object_or_404(User, username=username)
+    username = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    check(request, f'profile:{username.pk}')
     template = 'posts/profile.html'
     headline = f'Все посты пользователя {username.get_full_name()}'
 
-    n_posts = username.posts.count()
-    post_list = username.posts.all()
-    following = username.following.exists()
+    stats = get_author_stats(username)
+    post_list = username.posts.select_related('author', 'group')
+    following = follow_graph.is_following(request.user, username.pk)
+    # Подсказки — только на своей странице
+    recommended = (
+        recommendations.for_user(request.user)
+        if request.user == username else []
+    )
 
     context = {
         'headline': headline,
         'username': username,
-        'n_posts': n_posts,
+        'stats': stats,
+        'n_posts': stats.posts_count,
         'following': following,
+        'recommended': recommended,
         'page_obj': paginator_3000(post_list, request),
+        **feed_cache.context(f'profile:{username.pk}'),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional_get
 def post_detail(request, post_id):
     """Подробная информация о посте."""
 
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group', 'author__stats'),
+        id=post_id,
+    )
+    trending.record(post.pk, post.group_id, 'view')
+    # Комментарии и правки поста сдвигают ленту его автора
+    check(request, f'profile:{post.author_id}')
     template = 'posts/post_detail.html'
     headline = 'Вся информация о посте'
 
-    comments = post.comments.select_related('post')
+    comments = comments_page(post, request)
     form = CommentForm(request.POST or None)
-    n_posts = post.author.posts.count()
+    n_posts = get_author_stats(post.author).posts_count
 
     context = {
         'headline': headline,
@@ -95,7 +178,123 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional_get
+def post_comments(request, post_id):
+    """Следующая страница комментариев поста фрагментом HTML.
+
+    Те же страницы в JSON отдаёт /api/v1/posts/<id>/comments/.
+    """
+
+    post = get_object_or_404(Post.objects.only('pk', 'author_id'), pk=post_id)
+    check(request, f'profile:{post.author_id}', personal=False)
+    context = {
+        'post': post,
+        'comments': comments_page(post, request),
+    }
+    return render(request, 'posts/comment_list.html', context)
+
+
+@read_from_replica
+def post_search(request):
+    """Поиск по постам и комментариям."""
+
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    headline = 'Поиск'
+
+    paginator = Paginator(search.search(query), POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'headline': headline,
+        'query': query,
+        'page_obj': page_obj,
+        'paginator_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, template, context)
+
+
+@read_from_replica
+def post_search_api(request):
+    """Ранжированный поиск в JSON: фрагменты с подсветкой <mark>."""
+
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search.search(query), POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return JsonResponse({
+        'query': query,
+        'count': paginator.count,
+        'page': page_obj.number,
+        'num_pages': paginator.num_pages,
+        'results': [
+            {
+                'kind': hit.kind,
+                'id': hit.object_id,
+                'post_id': hit.post_id,
+                'author': hit.post.author.username,
+                'snippet': hit.snippet,
+                'rank': hit.rank,
+            }
+            for hit in page_obj
+        ],
+    })
+
+
+@read_from_replica
+@conditional_get
+def index_feed(request, fmt):
+    """RSS или Atom последних постов."""
+
+    return syndication.respond(request, 'index', 'index', fmt)
+
+
+@read_from_replica
+@conditional_get
+def group_feed(request, slug, fmt):
+    """RSS или Atom постов группы."""
+
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return syndication.respond(
+        request, 'group', f'group:{group.pk}', fmt, slug=slug)
+
+
+@read_from_replica
+@conditional_get
+def profile_feed(request, username, fmt):
+    """RSS или Atom постов автора."""
+
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return syndication.respond(
+        request, 'profile', f'profile:{author.pk}', fmt, username=username)
+
+
+@staff_member_required
+@read_from_replica
+def export(request, kind):
+    """Потоковая выгрузка постов или комментариев (для сотрудников)."""
+
+    if kind not in exports.KINDS:
+        raise Http404
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    fmt = form.cleaned_data['format']
+
+    # Тело читается после выхода из вида: базу выбираем сейчас
+    using = router.db_for_read(exports.KINDS[kind][0])
+    rows = exports.queryset(kind, using=using, **form.filters())
+    response = StreamingHttpResponse(
+        exports.stream(kind, fmt, exports.chunks(rows)),
+        content_type=exports.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
     """Страница создания нового поста."""
 
@@ -110,6 +309,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post.image.name)
         return redirect('posts:profile', username=request.user)
 
     context = {
@@ -119,6 +320,7 @@ def post_create(request):
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     """Страница редактирования поста (только автор)."""
 
@@ -136,6 +338,8 @@ def post_edit(request, post_id):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post.image.name)
         return redirect('posts:post_detail', post_id=post_id)
 
     context = {
@@ -147,6 +351,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     """Страница добавления комментария к посту на странице поста."""
 
@@ -163,37 +368,43 @@ def add_comment(request, post_id):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
     """Страница постов авторов, на которых подписан текущий пользователь."""
 
-    post_list = Post.objects.filter(author__following__user=request.user)
+    post_list = follow_feed(request.user).select_related('author', 'group')
     template = 'posts/follow.html'
     headline = 'Ваши подписки'
 
     context = {
         'headline': headline,
-        'page_obj': paginator_3000(post_list, request),
+        'page_obj': paginator_3000(
+            post_list, request, field=CURSOR_FIELD,
+            tiebreak=CURSOR_TIEBREAK),
+        'recommended': recommendations.for_user(request.user),
     }
     return render(request, template, context)
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     """Подписаться на автора."""
 
     author = get_object_or_404(User, username=username)
 
     if author != request.user:
-        Follow.objects.get_or_create(user=request.user, author=author)
+        follow_graph.follow(request.user.pk, author.pk)
     return redirect('posts:profile', author)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     """Дизлайк, отписка."""
 
     author = get_object_or_404(User, username=username)
 
     if author != request.user:
-        Follow.objects.filter(user=request.user, author=author).delete()
+        follow_graph.unfollow(request.user.pk, author.pk)
     return redirect('posts:profile', author)
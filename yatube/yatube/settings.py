@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,8 +33,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        # LocMemCache, который считает попадания и промахи
+        'BACKEND': 'core.cache.LocMemCache',
+    },
+    # Поколения лент и версии графа подписок сдвигают и команды
+    # manage.py, поэтому они живут в кэше, общем для всех процессов.
+    # Нужен атомарный incr(): файл SQLite на одной машине, memcached
+    # или redis на нескольких.
+    'shared': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(
+            tempfile.gettempdir(), 'yatube-cache.sqlite3'),
+    },
 }
 
 ALLOWED_HOSTS = [
@@ -51,6 +62,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',  # Добавили приложение core
     'users.apps.UsersConfig',  # Добавили приложение users
     'posts.apps.PostsConfig',  # Добавили приложение posts
+    'api.apps.ApiConfig',  # JSON API для мобильного клиента
     'django.contrib.admin',
     'django.contrib.auth',  # Приложение для регистрации и авторизации пользователей
     'django.contrib.contenttypes',
@@ -61,11 +73,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы мерить и остальные middleware
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,12 +89,26 @@ ROOT_URLCONF = 'yatube.urls'
 
 # Путь к директории с шаблонами вынесен в переменную:
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# Кэшировать скомпилированные шаблоны и компилировать их при старте
+# воркера. По умолчанию включено везде, кроме отладки; явно задаётся
+# переменной окружения YATUBE_TEMPLATE_CACHE (1 или 0).
+TEMPLATE_CACHE = os.environ.get(
+    'YATUBE_TEMPLATE_CACHE', '0' if DEBUG else '1') == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, который меряет время отрисовки
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],  # Добавлено: Искать шаблоны на уровне проекта
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -98,13 +127,48 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Прагмы SQLite на каждое новое соединение: WAL не блокирует чтение
+# записью, busy_timeout ждёт блокировку вместо «database is locked»
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16 * 1024,  # в КиБ
+    'temp_store': 'memory',
+    'busy_timeout': 5000,  # мс
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # sqlite3 с OPTIONS['pragmas'] и OPTIONS['transaction_mode']
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение переживает запрос, прагмы не ставятся заново
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Реплики только для чтения — копии основной базы. Пути к файлам копий
+# передаются через запятую в переменной окружения YATUBE_REPLICAS.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+        filter(None, os.environ.get('YATUBE_REPLICAS', '').split(','))):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает с основной базы
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -146,6 +210,34 @@ STATIC_URL = '/static/'
 # Добавили путь до статики
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Страницы лент сбрасываются по поколению при записи, поэтому TTL большой
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Подписки пользователя в кэше обновляются сигналами; TTL ограничивает
+# расхождение, если запись в кэш потерялась
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+
+# Сколько подсказок «кого почитать» хранит recommend_authors
+RECOMMENDATIONS_PER_USER = 10
+
+# Активность для «В тренде» копится в общем кэше корзинами по
+# TRENDING_BUCKET_SECONDS; fold_trending сворачивает последние
+# TRENDING_BUCKETS корзин в счёт, который вдвое падает за TRENDING_HALF_LIFE
+TRENDING_BUCKET_SECONDS = 5 * 60
+TRENDING_BUCKETS = 12
+TRENDING_HALF_LIFE = 6 * 60 * 60
+
+# Авторы с большим числом подписчиков не рассылают посты по лентам
+FEED_FANOUT_LIMIT = 10000
+
+# Копии картинок создаются пулом потоков после сохранения поста; 0 — сразу
+THUMBNAIL_WORKERS = 2
+
+# Гистограммы задержек по видам: процессы сбрасывают их сюда раз в
+# METRICS_FLUSH_INTERVAL секунд, команда dump_metrics их сводит
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+METRICS_FLUSH_INTERVAL = 10
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'